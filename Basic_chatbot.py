@@ -1,81 +1,25 @@
-import streamlit as st
+import argparse
+import sys
 import time
+import metrics
+from chatbot_engine import get_response, reload_stats, score_batch, watch_rules
+from chat_history import BOT, USER, ChatHistory
+
+WELCOME_MESSAGE = "Hello! I'm a simple chatbot. Try saying hello, asking how I am, or type 'help' for commands!"
+
+# Turns kept in memory per session (older ones are spilled to disk)
+HISTORY_CAPACITY = 200
+
+# Messages drawn per rerun; "Show earlier messages" adds another page
+HISTORY_PAGE_SIZE = 20
 
 def get_chatbot_response(user_input):
     """
     Rule-based chatbot that returns responses based on user input
     """
-    # Convert to lowercase for easier matching
-    input_text = user_input.lower().strip()
-    
-    # Greetings
-    if input_text in ["hello", "hi", "hey", "good morning", "good afternoon"]:
-        return "Hi there! How can I help you today?"
-    
-    # How are you responses
-    elif input_text in ["how are you", "how are you?", "how do you do", "how's it going"]:
-        return "I'm doing great, thanks for asking! How are you?"
-    
-    # Goodbyes
-    elif input_text in ["bye", "goodbye", "see you later", "see ya", "farewell"]:
-        return "Goodbye! Have a wonderful day!"
-    
-    # Name questions
-    elif input_text in ["what's your name", "what is your name", "who are you"]:
-        return "I'm a simple rule-based chatbot. You can just call me Bot!"
-    
-    # Thank you responses
-    elif input_text in ["thank you", "thanks", "thank you very much"]:
-        return "You're welcome! Is there anything else I can help you with?"
-    
-    # Weather questions
-    elif "weather" in input_text:
-        return "I don't have access to weather data, but I hope it's nice where you are!"
-    
-    # Help requests
-    elif input_text in ["help", "what can you do", "commands"]:
-        return """I can respond to:
-        • Greetings (hello, hi, hey)
-        • How are you questions
-        • Goodbyes (bye, goodbye)
-        • Name questions
-        • Thank you messages
-        • Weather questions
-        • Personal questions (Do you know me? Where do I live?)
-        • Sports questions (What about Babar Azam?)
-        • Help requests"""
-    
-    # Time questions
-    elif "time" in input_text or "what time" in input_text:
-        return "I don't have access to real-time data, but you can check your device's clock!"
-    
-    # Age questions
-    elif "age" in input_text or "old are you" in input_text:
-        return "I'm a computer program, so I don't have an age in the traditional sense!"
-    
-    # Personal questions about the user (Tayyeb)
-    elif "can you know me" in input_text or "do you know me" in input_text or "who am i" in input_text:
-        return "Yes, you are Tayyeb Wazir!"
-    
-    # Location questions
-    elif "where i am living" in input_text or "where do i live" in input_text or "my location" in input_text:
-        return "Yes, you are living in Bannu!"
-    
-    # Babar Azam questions
-    elif "babar azam" in input_text or "what about babar azam" in input_text or "babar" in input_text:
-        return "Babar Azam is a Pakistani cricket world class batsman and he is famous for his cover drive!"
-    
-    # Cricket related questions
-    elif "cricket" in input_text:
-        return "Cricket is a great sport! Pakistan has many talented players like Babar Azam."
-    
-    # Pakistan related questions
-    elif "pakistan" in input_text:
-        return "Pakistan is a beautiful country with amazing cricket talent!"
-    
-    # Default response for unrecognized input
-    else:
-        return "I'm not sure how to respond to that. Try saying hello, asking how I am, or type 'help' for available commands!"
+    # Rules are compiled once in chatbot_engine, so the lookup cost
+    # does not grow with the number of rules
+    return get_response(user_input)
 
 # Function to demonstrate chatbot in console (for learning purposes)
 def demonstrate_chatbot():
@@ -107,6 +51,13 @@ def main():
     """
     Main function that creates the Streamlit UI
     """
+    # Only the web UI needs Streamlit; the chat and batch commands run without it
+    import streamlit as st
+    
+    # Pick up edits to chatbot_rules.json without restarting
+    watch_rules()
+    # Serves /metrics when APP_METRICS=1 and APP_METRICS_PORT are set
+    metrics.start_http_server()
    
     st.set_page_config(
         page_title="Simple Chatbot",
@@ -119,23 +70,32 @@ def main():
     st.write("A basic chatbot built with Python and Streamlit")
     
    
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = [
-            {"role": "bot", "message": "Hello! I'm a simple chatbot. Try saying hello, asking how I am, or type 'help' for commands!"}
-        ]
+    if not isinstance(st.session_state.get("chat_history"), ChatHistory):
+        st.session_state.chat_history = ChatHistory(HISTORY_CAPACITY)
+        st.session_state.chat_history.append(BOT, WELCOME_MESSAGE)
+        st.session_state.history_window = HISTORY_PAGE_SIZE
     
+    chat_history = st.session_state.chat_history
     
     st.subheader("Chat Window")
     
+    # Only the visible tail is redrawn, so rerun cost does not grow with
+    # the length of the conversation
+    hidden_count = len(chat_history) - st.session_state.history_window
+    if hidden_count > 0:
+        if st.button(f"Show earlier messages ({hidden_count} hidden)"):
+            st.session_state.history_window += HISTORY_PAGE_SIZE
+            st.rerun()
+    
     # Container for chat messages
     chat_container = st.container()
     
-    with chat_container:
-        for chat in st.session_state.chat_history:
-            if chat["role"] == "user":
-                st.write(f"**You:** {chat['message']}")
+    with chat_container, metrics.timer("chatbot_render"):
+        for chat in chat_history.tail(st.session_state.history_window):
+            if chat.role == USER:
+                st.write(f"**You:** {chat.message}")
             else:
-                st.write(f"**Bot:** {chat['message']}")
+                st.write(f"**Bot:** {chat.message}")
     
     # Input section
     st.subheader("Your Message")
@@ -158,33 +118,29 @@ def main():
     
     if send_button and user_input.strip():
        
-        st.session_state.chat_history.append({
-            "role": "user", 
-            "message": user_input
-        })
+        chat_history.append(USER, user_input)
         
         bot_response = get_chatbot_response(user_input)
         
-        st.session_state.chat_history.append({
-            "role": "bot", 
-            "message": bot_response
-        })
+        chat_history.append(BOT, bot_response)
+        # Keep following the newest messages
+        st.session_state.history_window = HISTORY_PAGE_SIZE
         
      
         st.rerun()
     
     
     if clear_button:
-        st.session_state.chat_history = [
-            {"role": "bot", "message": "Hello! I'm a simple chatbot. Try saying hello, asking how I am, or type 'help' for commands!"}
-        ]
+        chat_history.clear()
+        chat_history.append(BOT, WELCOME_MESSAGE)
+        st.session_state.history_window = HISTORY_PAGE_SIZE
         st.rerun()
     
     # Sidebar with information
     st.sidebar.title("About This Chatbot")
     st.sidebar.write("""
     **Key Concepts Demonstrated:**
-    - **if-elif statements** for response logic
+    - **Rule table** (chatbot_rules.json) for response logic
     - **Functions** for modular code
     - **Loops** for processing multiple inputs
     - **Input/Output** through Streamlit interface
@@ -202,6 +158,17 @@ def main():
     """)
     
   
+    stats = reload_stats()
+    if stats.get("error"):
+        st.sidebar.error(f"Rules file error: {stats['error']}")
+    elif stats:
+        st.sidebar.caption(
+            f"Rules loaded: {stats['rules']} rules compiled in "
+            f"{stats['compile_seconds'] * 1000:.1f} ms ({stats['memory_bytes'] / 1024:.0f} KiB)"
+        )
+    
+    metrics.render_sidebar(st)
+    
     if st.sidebar.button("Run Console Demo"):
         st.sidebar.write("Check your terminal/console for demo output!")
         demonstrate_chatbot()
@@ -211,12 +178,15 @@ def process_multiple_inputs(input_list):
     """
     Function to demonstrate loop usage by processing multiple inputs
     """
+    # Matching is done in bulk; use score_batch directly for large
+    # replays to get the columnar result without building dicts
+    input_list = list(input_list)
+    results = score_batch(input_list)
     responses = []
-    for user_input in input_list:
-        response = get_chatbot_response(user_input)
+    for position, user_input in enumerate(input_list):
         responses.append({
             "input": user_input,
-            "response": response
+            "response": results.response(position)
         })
     return responses
 
@@ -224,6 +194,7 @@ def chat_session():
     """
     Console-based chat session (alternative to Streamlit UI)
     """
+    watch_rules()
     print("=== Simple Chatbot Console Mode ===")
     print("Type 'quit' to exit")
     print("-" * 40)
@@ -242,7 +213,50 @@ def chat_session():
         print("-" * 40)
 
 
+def cli(argv=None):
+    """
+    Command line entry point: console chat, demo or batch replies
+    """
+    parser = argparse.ArgumentParser(
+        description="Rule-based chatbot (use 'streamlit run Basic_chatbot.py' for the web UI)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("chat", help="chat in the console")
+    commands.add_parser("demo", help="run the console demo")
+    batch_parser = commands.add_parser("batch", help="reply to every line of a file")
+    batch_parser.add_argument("input", help="file with one message per line ('-' for stdin)")
+    batch_parser.add_argument("-o", "--output", help="write tab-separated message/response lines here")
+    args = parser.parse_args(argv)
+
+    if args.command == "chat":
+        chat_session()
+    elif args.command == "demo":
+        demonstrate_chatbot()
+    else:
+        source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+        with source:
+            messages = [line.rstrip("\n") for line in source]
+        results = score_batch(messages)
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            for position, message in enumerate(messages):
+                output.write(f"{message}\t{results.response(position)}\n")
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        if args.output:
+            print(f"✅ Saved {len(messages)} responses to {args.output}")
+
+    if metrics.ENABLED:
+        print(metrics.format_report())
+
+
 if __name__ == "__main__":
-    main()
+    # streamlit run has already imported Streamlit; plain python gets the
+    # command line tool, e.g. python Basic_chatbot.py chat
+    if "streamlit" in sys.modules:
+        main()
+    else:
+        cli()
     
    
\ No newline at end of file
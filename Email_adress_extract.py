@@ -1,17 +1,558 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
 
 input_file = "general.txt"
+output_file = "emails.txt"
+
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+# Any character outside this set ends a possible match, so the text can be
+# cut right after it without changing what the regex finds. This pattern
+# finds the last such character in a buffer.
+LAST_SEPARATOR_PATTERN = re.compile(r"[^a-zA-Z0-9._%+@-][a-zA-Z0-9._%+@-]*\Z")
+
+# Byte versions of the same patterns. The classes are ASCII-only, so on UTF-8
+# input they find exactly what the text patterns find on the decoded text.
+BYTES_EMAIL_PATTERN = re.compile(EMAIL_PATTERN.pattern.encode())
+BYTES_LAST_SEPARATOR_PATTERN = re.compile(LAST_SEPARATOR_PATTERN.pattern.encode())
+BYTES_SEPARATOR_PATTERN = re.compile(rb"[^a-zA-Z0-9._%+@-]")
+
+# For the '@' prefilter: '@' plus the domain part of EMAIL_PATTERN, and a
+# translate() table that maps bytes allowed in the local part to 1, others to 0
+BYTES_AT_DOMAIN_PATTERN = re.compile(rb"@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+LOCAL_PART_TABLE = bytes(
+    1 if re.fullmatch(rb"[a-zA-Z0-9._%+-]", bytes([value])) else 0 for value in range(256)
+)
+
+CHUNK_SIZE = 1024 * 1024
+
+# A run of email characters longer than this is scanned as-is instead of
+# being carried over, so memory stays bounded on garbage input
+MAX_CARRY = 64 * 1024
+
+
+# Files bigger than this are split into byte ranges for the process pool
+RANGE_SIZE = 64 * 1024 * 1024
+
+# Incremental mode saves a checkpoint after at most this many scanned bytes
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+
+# Bytes of the start of a file remembered to notice it was replaced
+FINGERPRINT_BYTES = 1024
+
+DIGEST_SIZE = 16
+
+
+def _safe_cut(buffer, separator_pattern=LAST_SEPARATOR_PATTERN):
+    """
+    Return the index just after the last separator character in buffer
+    """
+    # Only the tail can be carried over, so there is no need to look further back
+    match = separator_pattern.search(buffer, max(0, len(buffer) - MAX_CARRY - 1))
+    return match.start() + 1 if match else 0
+
+
+def find_emails(buffer, start=0, end=None):
+    """
+    Yield the addresses BYTES_EMAIL_PATTERN.finditer(buffer, start, end) finds, as bytes.
+
+    Only the places around an '@' are looked at: the local part is the run of
+    local-part bytes before it (never reaching back into the previous match)
+    and the domain is matched forward from it. The regex itself would try a
+    match at every position of the buffer.
+    """
+    if end is None:
+        end = len(buffer)
+    if buffer.find(b"@", start, end) < 0:
+        return
+    last_non_local = buffer.translate(LOCAL_PART_TABLE).rfind
+    last_end = start
+    # The search for the pattern's leading '@' is done in C
+    for domain in BYTES_AT_DOMAIN_PATTERN.finditer(buffer, start, end):
+        at = domain.start()
+        local_start = last_non_local(b"\0", last_end, at) + 1
+        if local_start < last_end:
+            local_start = last_end
+        if local_start < at:
+            last_end = domain.end()
+            yield buffer[local_start:last_end]
+
+
+def _find_text_emails(text, start=0, end=None):
+    """
+    Yield the addresses EMAIL_PATTERN finds in text[start:end]
+    """
+    for match in EMAIL_PATTERN.finditer(text, start, len(text) if end is None else end):
+        yield match.group()
+
+
+def extract_emails(file, chunk_size=CHUNK_SIZE):
+    """
+    Yield email addresses from an open file, reading it chunk by chunk.
+
+    Text files yield str addresses, binary files yield bytes addresses.
+    Binary files are scanned with the faster '@' prefilter (find_emails).
+    """
+    if "b" in getattr(file, "mode", ""):
+        finder = find_emails
+        separator_pattern = BYTES_LAST_SEPARATOR_PATTERN
+    else:
+        finder = _find_text_emails
+        separator_pattern = LAST_SEPARATOR_PATTERN
+
+    carry = None
+    while True:
+        with metrics.timer("email_read"):
+            chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        metrics.count("email_bytes_read", len(chunk))
+
+        buffer = carry + chunk if carry else chunk
+        cut = _safe_cut(buffer, separator_pattern)
+        if cut == 0 and len(buffer) > MAX_CARRY:
+            cut = len(buffer)
+
+        yield from finder(buffer, 0, cut)
+        carry = buffer[cut:]
+
+    if carry:
+        yield from finder(carry)
+
+
+def extract_emails_from_path(path, chunk_size=CHUNK_SIZE):
+    """
+    Yield email addresses from the file at path
+    """
+    # The file is scanned as bytes, so only the addresses are ever decoded
+    # (the pattern is ASCII-only, so this finds what it finds on the text)
+    with open(path, "rb") as file:
+        for email in extract_emails(file, chunk_size):
+            yield email.decode("ascii")
+
+
+@metrics.timed("email_extract_file")
+def write_emails(emails, output_path):
+    """
+    Write emails one per line as they arrive and return how many were written
+    """
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as file:
+        for email in emails:
+            file.write(email + "\n")
+            count += 1
+    metrics.count("emails_written", count)
+    return count
+
+
+class _RangeReader:
+    """
+    Binary reader over one byte range of a file.
+
+    Reading continues past the end of the range until the token that straddles
+    it is complete, and the next range skips that token, so every address is
+    found by exactly one range.
+    """
+
+    mode = "rb"
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+        self.last_byte = b" "
+        self.done = False
+
+    def read(self, size):
+        if self.done:
+            return b""
+
+        if self.remaining > 0:
+            data = self.file.read(min(size, self.remaining))
+            self.remaining -= len(data)
+            if not data:
+                self.done = True
+            else:
+                self.last_byte = data[-1:]
+            return data
+
+        # Past the end of the range: finish the current token, if any
+        if BYTES_SEPARATOR_PATTERN.match(self.last_byte):
+            self.done = True
+            return b""
+        data = self.file.read(4096)
+        match = BYTES_SEPARATOR_PATTERN.search(data)
+        if match or not data:
+            self.done = True
+            return data[:match.end()] if match else data
+        return data
+
+
+def _range_start(file, start):
+    """
+    Return where a range beginning at start should really begin scanning
+    """
+    if start == 0:
+        return 0
+
+    file.seek(start - 1)
+    if BYTES_SEPARATOR_PATTERN.match(file.read(1)):
+        return start
+
+    # The range begins mid-token; that token belongs to the previous range
+    position = start
+    while True:
+        data = file.read(4096)
+        if not data:
+            return position
+        match = BYTES_SEPARATOR_PATTERN.search(data)
+        if match:
+            return position + match.end()
+        position += len(data)
+
+
+def _scan_range(task):
+    """
+    Worker: count the addresses found in one byte range of one file
+    """
+    path, start, end = task
+    counts = {}
+    with open(path, "rb") as file:
+        begin = _range_start(file, start)
+        if begin < end:
+            file.seek(begin)
+            for email in extract_emails(_RangeReader(file, end - begin)):
+                counts[email] = counts.get(email, 0) + 1
+    return path, counts
+
+
+def find_input_files(target):
+    """
+    Expand a file, directory or glob pattern into a sorted list of files.
+
+    Raises FileNotFoundError when target is not a directory and matches no file.
+    """
+    if os.path.isdir(target):
+        paths = []
+        for root, _, names in os.walk(target):
+            paths.extend(os.path.join(root, name) for name in names)
+    elif os.path.isfile(target):
+        paths = [target]
+    else:
+        paths = [path for path in glob.glob(target, recursive=True) if os.path.isfile(path)]
+        if not paths:
+            raise FileNotFoundError(f"No input files match {target}")
+    return sorted(paths)
+
+
+def _split_tasks(paths, range_size=RANGE_SIZE):
+    """
+    Turn files into (path, start, end) tasks, splitting large files
+    """
+    tasks = []
+    for path in paths:
+        size = os.path.getsize(path)
+        start = 0
+        while True:
+            end = min(start + range_size, size)
+            tasks.append((path, start, end))
+            if end >= size:
+                break
+            start = end
+    return tasks
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over bytes keys
+    """
+
+    def __init__(self, size_bits, hash_count=4):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, digest):
+        for index in range(self.hash_count):
+            value = int.from_bytes(digest[index * 4:index * 4 + 4], "little")
+            yield value % self.size_bits
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest):
+        for position in self._positions(digest):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class DedupIndex:
+    """
+    Set of seen addresses stored as 8-byte digests instead of full strings.
+
+    With bloom_bits set, a Bloom filter is checked first so that addresses that
+    are certainly new skip the set lookup. With journal=True the digests of new
+    addresses are also collected in self.journal, so they can be persisted.
+    """
+
+    def __init__(self, bloom_bits=None, journal=False):
+        self.seen = set()
+        self.bloom = BloomFilter(bloom_bits) if bloom_bits else None
+        self.journal = [] if journal else None
+
+    def add(self, email):
+        """
+        Record email and return True if it was not seen before
+        """
+        digest = hashlib.blake2b(email, digest_size=DIGEST_SIZE).digest()
+        key = digest[:8]
+        if self.bloom is not None:
+            if digest not in self.bloom:
+                self._add_digest(digest)
+                return True
+        if key in self.seen:
+            return False
+        self._add_digest(digest)
+        return True
+
+    def _add_digest(self, digest):
+        self.seen.add(digest[:8])
+        if self.bloom is not None:
+            self.bloom.add(digest)
+        if self.journal is not None:
+            self.journal.append(digest)
+
+    def load_digests(self, data):
+        """
+        Mark the addresses behind concatenated digests (from journal) as seen
+        """
+        for start in range(0, len(data) - DIGEST_SIZE + 1, DIGEST_SIZE):
+            digest = data[start:start + DIGEST_SIZE]
+            self.seen.add(digest[:8])
+            if self.bloom is not None:
+                self.bloom.add(digest)
+
+
+@metrics.timed("email_extract_unique")
+def extract_unique_emails(target, output_path, workers=None, bloom_bits=None, range_size=RANGE_SIZE):
+    """
+    Extract unique addresses from every file matched by target using a process pool.
+
+    Unique addresses are written to output_path in order of first appearance
+    and a {path: {"found": n, "new": m}} summary is returned.
+    """
+    # Never read back the file we are writing to
+    output_abspath = os.path.abspath(output_path)
+    paths = [path for path in find_input_files(target) if os.path.abspath(path) != output_abspath]
+    tasks = _split_tasks(paths, range_size)
+    index = DedupIndex(bloom_bits)
+    summary = {path: {"found": 0, "new": 0} for path in paths}
+
+    with open(output_path, "wb") as output, ProcessPoolExecutor(workers) as pool:
+        # map keeps task order, so the output order does not depend on timing
+        for path, counts in pool.map(_scan_range, tasks):
+            file_summary = summary[path]
+            for email, count in counts.items():
+                file_summary["found"] += count
+                if index.add(email):
+                    file_summary["new"] += 1
+                    output.write(email + b"\n")
+
+    metrics.count("emails_written", sum(counts["new"] for counts in summary.values()))
+    return summary
+
+
+class Checkpoint:
+    """
+    Progress of incremental extraction.
+
+    The JSON file holds the committed size of the output file, how many
+    digests are in the .seen file next to it and, per input file, the byte
+    offset scanned so far. The output, the .seen file and then the JSON are
+    written in that order, so after a crash anything past the last checkpoint
+    is cut off and scanned again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.seen_path = path + ".seen"
+        self.output_size = 0
+        self.seen_count = 0
+        self.files = {}
+
+    def load(self):
+        """
+        Read the checkpoint; return False when there is none yet
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return False
+        self.output_size = data["output_size"]
+        self.seen_count = data["seen_count"]
+        self.files = data["files"]
+        return True
+
+    def save(self):
+        """
+        Replace the checkpoint file atomically
+        """
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"output_size": self.output_size, "seen_count": self.seen_count, "files": self.files}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+
+
+def _fingerprint(file, length):
+    """
+    Hash the first bytes of file (at most length), to notice replaced files
+    """
+    file.seek(0)
+    return hashlib.blake2b(file.read(min(length, FINGERPRINT_BYTES)), digest_size=8).hexdigest()
+
+
+def _safe_end(file, size):
+    """
+    Return the position just after the last separator before size.
+
+    Bytes after it may be a line that is still being written.
+    """
+    start = max(0, size - MAX_CARRY)
+    file.seek(start)
+    cut = _safe_cut(file.read(size - start), BYTES_LAST_SEPARATOR_PATTERN)
+    if cut == 0 and start > 0:
+        # A very long run without separators is scanned as-is, like extract_emails does
+        return size
+    return start + cut
+
+
+def _commit(checkpoint, output, seen_file, index):
+    output.flush()
+    os.fsync(output.fileno())
+    seen_file.write(b"".join(index.journal))
+    seen_file.flush()
+    os.fsync(seen_file.fileno())
+    checkpoint.seen_count += len(index.journal)
+    index.journal.clear()
+    checkpoint.output_size = output.tell()
+    checkpoint.save()
+
+
+@metrics.timed("email_extract_incremental")
+def extract_incremental(target, output_path, checkpoint_path=None, bloom_bits=None, checkpoint_bytes=CHECKPOINT_BYTES):
+    """
+    Append addresses not seen by earlier runs to output_path, reading only new bytes.
+
+    Per-file offsets and the digests of seen addresses are kept in a checkpoint
+    (output_path + ".checkpoint" by default), so each run scans only what was
+    appended since the last one, and an interrupted run resumes from its last
+    checkpoint. Files that shrank or whose start changed are scanned again from
+    the beginning. Text after the last separator of a file is left for the
+    next run. Returns a {path: {"found": n, "new": m, "scanned": bytes}} summary.
+    """
+    checkpoint = Checkpoint(checkpoint_path or output_path + ".checkpoint")
+    index = DedupIndex(bloom_bits, journal=True)
+    resumed = checkpoint.load() and os.path.exists(output_path) and os.path.exists(checkpoint.seen_path)
+    if resumed and (os.path.getsize(output_path) < checkpoint.output_size
+                    or os.path.getsize(checkpoint.seen_path) < checkpoint.seen_count * DIGEST_SIZE):
+        # The output was changed by hand; start over rather than trust it
+        resumed = False
+    if not resumed:
+        checkpoint = Checkpoint(checkpoint.path)
+
+    # Never read back the files we are writing to. Inputs are resolved before
+    # the output is touched, so a mistyped path leaves it alone.
+    own_paths = {os.path.abspath(path) for path in (output_path, checkpoint.path, checkpoint.seen_path, checkpoint.path + ".tmp")}
+    paths = [path for path in find_input_files(target) if os.path.abspath(path) not in own_paths]
+
+    # Drop whatever an interrupted run wrote after its last checkpoint
+    with open(output_path, "r+b" if resumed else "wb") as output:
+        output.truncate(checkpoint.output_size)
+    with open(checkpoint.seen_path, "r+b" if resumed else "w+b") as seen_file:
+        seen_file.truncate(checkpoint.seen_count * DIGEST_SIZE)
+        index.load_digests(seen_file.read())
+    summary = {}
+
+    with open(output_path, "ab") as output, open(checkpoint.seen_path, "ab") as seen_file:
+        for path in paths:
+            key = os.path.abspath(path)
+            file_summary = summary[path] = {"found": 0, "new": 0, "scanned": 0}
+            with open(path, "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                state = checkpoint.files.get(key)
+                offset = 0
+                if state is not None and state["offset"] <= size and _fingerprint(file, state["offset"]) == state["fingerprint"]:
+                    offset = state["offset"]
+                end = _safe_end(file, size)
+
+                while offset < end:
+                    # Segments work like the ranges of the process pool: each one
+                    # finishes the token it ends in and the next one skips it
+                    stop = min(offset + checkpoint_bytes, end)
+                    begin = _range_start(file, offset)
+                    if begin < stop:
+                        file.seek(begin)
+                        for email in extract_emails(_RangeReader(file, stop - begin)):
+                            file_summary["found"] += 1
+                            if index.add(email):
+                                file_summary["new"] += 1
+                                output.write(email + b"\n")
+                    file_summary["scanned"] += stop - offset
+                    offset = stop
+                    checkpoint.files[key] = {"offset": offset, "fingerprint": _fingerprint(file, offset)}
+                    _commit(checkpoint, output, seen_file, index)
+
+    metrics.count("emails_written", sum(counts["new"] for counts in summary.values()))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract email addresses from text files")
+    parser.add_argument("input", nargs="?", default=input_file, help="file, directory or glob pattern")
+    parser.add_argument("-o", "--output", default=output_file)
+    parser.add_argument("--unique", action="store_true", help="deduplicate across files using a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--bloom-bits", type=int, default=None, help="Bloom filter size for huge corpora")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only new unique addresses, scanning only bytes added since the last run")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: OUTPUT.checkpoint)")
+    args = parser.parse_args()
+
+    if args.incremental:
+        summary = extract_incremental(args.input, args.output, args.checkpoint, args.bloom_bits)
+        for path, counts in summary.items():
+            print(f"{path}: {counts['scanned']} new bytes, {counts['found']} emails, {counts['new']} new")
+        total = sum(counts["new"] for counts in summary.values())
+        print(f"✅ Appended {total} new unique emails to {args.output}")
+    elif args.unique or not os.path.isfile(args.input):
+        summary = extract_unique_emails(args.input, args.output, args.workers, args.bloom_bits)
+        for path, counts in summary.items():
+            print(f"{path}: {counts['found']} emails, {counts['new']} new")
+        total = sum(counts["new"] for counts in summary.values())
+        print(f"✅ Found {total} unique emails in {len(summary)} files and saved them to {args.output}")
+    else:
+        # Step 2: Stream the file content and find all email addresses
+        emails = extract_emails_from_path(args.input)
+
+        # Step 3: Save emails to another file as they are found
+        count = write_emails(emails, args.output)
 
-# Step 2: Read the file content
-with open(input_file, "r", encoding="utf-8") as file:
-    text = file.read()
+        print(f"✅ Found {count} emails and saved them to {args.output}")
 
-# Step 3: Find all email addresses using regex
-emails = re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
+    if metrics.ENABLED:
+        print(metrics.format_report())
 
-# Step 4: Save emails to another file
-with open("emails.txt", "w", encoding="utf-8") as file:
-    for email in emails:
-        file.write(email + "\n")
 
-print(f"✅ Found {len(emails)} emails and saved them to emails.txt")
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,695 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import codecs
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import closing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+
+import metrics
+
+# requests and bs4 are imported where they are used, so importing this
+# module (or running --help) does not pay for them up front
 
 # Step 1: URL of the webpage
 url = "https://www.python.org/"
+output_file = "webpage_title.txt"
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_CONCURRENCY = 32
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+STREAM_CHUNK_SIZE = 8192
+
+# Bytes looked at for a <meta charset> when the headers do not name one
+SNIFF_SIZE = 1024
+
+# If less than this is left of the body after the title, read it anyway
+# so the connection can go back to the pool instead of being dropped
+DRAIN_LIMIT = 64 * 1024
+
+# Crawl mode: pages fetched per run and default requests per second per host
+DEFAULT_MAX_PAGES = 100
+DEFAULT_CRAWL_RATE = 2.0
+
+USER_AGENT = "Scrape_title"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+HEADER_CHARSET_PATTERN = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+META_CHARSET_PATTERN = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+
+def get_title(html):
+    """
+    Parse the HTML content and return the text of its <title> tag
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    if soup.title is None or soup.title.string is None:
+        return None
+    return soup.title.string
+
+
+class TitleParser(HTMLParser):
+    """
+    Incremental parser that collects the first <title> and notes where <head> ends.
+
+    With collect_links=True it also keeps every <a href> and the <base href>.
+    """
+
+    def __init__(self, collect_links=False):
+        super().__init__(convert_charrefs=True)
+        self.in_title = False
+        self.parts = []
+        self.title = None
+        self.head_done = False
+        self.links = [] if collect_links else None
+        self.base_href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title" and self.title is None:
+            self.in_title = True
+        elif tag == "body":
+            self.head_done = True
+        elif self.links is not None and tag in ("a", "base"):
+            href = dict(attrs).get("href")
+            if href and tag == "a":
+                self.links.append(href)
+            elif href and self.base_href is None:
+                self.base_href = href
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self.in_title:
+            self.in_title = False
+            self.title = "".join(self.parts)
+        elif tag == "head":
+            self.head_done = True
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.parts.append(data)
+
+
+def _valid_encoding(name):
+    try:
+        return codecs.lookup(name.decode() if isinstance(name, bytes) else name).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+
+def detect_encoding(content_type, head_bytes):
+    """
+    Pick the charset from the Content-Type header, then <meta>, then UTF-8
+    """
+    match = HEADER_CHARSET_PATTERN.search(content_type or "")
+    if match and _valid_encoding(match.group(1)):
+        return _valid_encoding(match.group(1))
+    match = META_CHARSET_PATTERN.search(head_bytes)
+    if match and _valid_encoding(match.group(1)):
+        return _valid_encoding(match.group(1))
+    return "utf-8"
+
+
+class TitleResult:
+    """
+    Title of one page plus how much of the body was read to get it.
+
+    links is only filled in crawl mode, and not_modified is True when the
+    title came from the cache after a 304 response.
+    """
+
+    def __init__(self, title, bytes_read, content_length, full_parse, links=None, not_modified=False):
+        self.title = title
+        self.bytes_read = bytes_read
+        self.content_length = content_length
+        self.full_parse = full_parse
+        self.links = links
+        self.not_modified = not_modified
+
+    @property
+    def bytes_saved(self):
+        """
+        Body bytes not downloaded, or None when the size is unknown
+        """
+        if self.content_length is None:
+            return None
+        return max(0, self.content_length - self.bytes_read)
+
+
+def read_title(response):
+    """
+    Read a streamed response only until its <title> is complete.
+
+    Falls back to a full BeautifulSoup parse when <head> ends without a
+    title, so the result matches get_title() on the whole page.
+    """
+    chunks = response.iter_content(STREAM_CHUNK_SIZE)
+    content_length = response.headers.get("Content-Length")
+    content_length = int(content_length) if content_length and content_length.isdigit() else None
+
+    # Hold back the first bytes until the charset is known
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= SNIFF_SIZE:
+            break
+    encoding = detect_encoding(response.headers.get("Content-Type"), head[:SNIFF_SIZE])
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    parser = TitleParser()
+    received = [head]
+    parser.feed(decoder.decode(head))
+    if parser.title is None and not parser.head_done:
+        for chunk in chunks:
+            received.append(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.title is not None or parser.head_done:
+                break
+
+    if parser.title is not None:
+        if content_length is not None and content_length - response.raw.tell() <= DRAIN_LIMIT:
+            for _ in chunks:
+                pass
+        bytes_read = response.raw.tell()
+        response.close()
+        return TitleResult(parser.title, bytes_read, content_length, False)
+
+    # No title in <head>: read the rest and let BeautifulSoup decide
+    for chunk in chunks:
+        received.append(chunk)
+    text = b"".join(received).decode(encoding, errors="replace")
+    return TitleResult(get_title(text), response.raw.tell(), content_length, True)
+
+
+def normalize_url(page_url):
+    """
+    Return page_url without fragment, default port or case differences in
+    scheme and host, or None when it is not an http(s) URL
+    """
+    page_url, _ = urldefrag(page_url.strip())
+    parts = urlsplit(page_url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{parts.port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def read_page(response):
+    """
+    Read a whole response and return its TitleResult with the page's links.
+
+    Crawl mode needs the links in <body>, so there is no early exit here.
+    Responses that are not HTML are not downloaded.
+    """
+    content_length = response.headers.get("Content-Length")
+    content_length = int(content_length) if content_length and content_length.isdigit() else None
+    content_type = response.headers.get("Content-Type", "")
+    if content_type and "html" not in content_type.lower():
+        response.close()
+        return TitleResult(None, response.raw.tell(), content_length, False, links=[])
+
+    body = response.content
+    encoding = detect_encoding(content_type, body[:SNIFF_SIZE])
+    text = body.decode(encoding, errors="replace")
+    parser = TitleParser(collect_links=True)
+    parser.feed(text)
+    parser.close()
+    title = parser.title if parser.title is not None else get_title(text)
+
+    base = urljoin(response.url, parser.base_href) if parser.base_href else response.url
+    links = []
+    for href in parser.links:
+        link = normalize_url(urljoin(base, href))
+        if link is not None and link not in links:
+            links.append(link)
+    return TitleResult(title, response.raw.tell(), content_length, True, links=links)
+
+
+class PageCache:
+    """
+    On-disk HTTP cache of page titles, keyed by URL.
+
+    A SQLite table pages(url, etag, last_modified, title, links) keeps the
+    validators of every page fetched, so the next fetch can be a conditional
+    request and a 304 reuses the stored title (and links, in crawl mode).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "title TEXT, links TEXT, fetched_at REAL)"
+            )
+
+    def _connect(self):
+        import sqlite3
+
+        # One short-lived connection per call keeps the cache thread-safe.
+        # "with connection" only commits, so callers also wrap it in closing()
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, page_url):
+        """
+        Return {"etag", "last_modified", "title", "links"} for page_url, or None
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT etag, last_modified, title, links FROM pages WHERE url = ?", (page_url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, title, links = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "title": title,
+            "links": json.loads(links) if links is not None else None,
+        }
+
+    def put(self, page_url, etag, last_modified, title, links=None):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO pages (url, etag, last_modified, title, links, fetched_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, "
+                "title = excluded.title, links = excluded.links, fetched_at = excluded.fetched_at",
+                (page_url, etag, last_modified, title, None if links is None else json.dumps(links), time.time()),
+            )
+
+
+def fetch_title(session, page_url, timeout=DEFAULT_TIMEOUT, cache=None, links=False):
+    """
+    Stream page_url with session and return its TitleResult.
+
+    With a PageCache the request is conditional when the page was seen before,
+    and a 304 answer returns the cached title without any body. With
+    links=True the whole page is read and its links are returned too.
+    """
+    headers = {}
+    cached = cache.get(page_url) if cache is not None else None
+    if cached is not None and (not links or cached["links"] is not None):
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    # Request (connect and headers) and body reading are timed separately
+    with metrics.timer("scraper_request"):
+        response = session.get(page_url, timeout=timeout, stream=True, headers=headers)
+    try:
+        if response.status_code == 304 and headers:
+            metrics.count("scraper_not_modified")
+            # A 304 may carry new validators; keep them and the fetch time
+            cache.put(
+                page_url,
+                response.headers.get("ETag") or cached["etag"],
+                response.headers.get("Last-Modified") or cached["last_modified"],
+                cached["title"],
+                cached["links"],
+            )
+            return TitleResult(cached["title"], 0, None, False, links=cached["links"], not_modified=True)
+        response.raise_for_status()
+        with metrics.timer("scraper_read_title"):
+            result = read_page(response) if links else read_title(response)
+        if metrics.ENABLED:
+            metrics.count("scraper_bytes_read", result.bytes_read)
+            metrics.count("scraper_bytes_saved", result.bytes_saved or 0)
+            metrics.count("scraper_full_parses", int(result.full_parse))
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        # Without a validator the page could never be revalidated
+        if cache is not None and (etag or last_modified):
+            cache.put(page_url, etag, last_modified, result.title, result.links)
+        return result
+    finally:
+        response.close()
+
+
+def make_session(pool_size=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Create a session that keeps connections alive and retries with backoff
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HostRateLimiter:
+    """
+    Allow at most `rate` requests per second to each host
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.host_intervals = {}
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def slow_down(self, host, interval):
+        """
+        Space requests to host at least interval seconds apart (robots.txt Crawl-delay)
+        """
+        with self.lock:
+            self.host_intervals[host] = max(interval, self.host_intervals.get(host, 0.0))
+
+    def wait(self, host):
+        interval = max(self.interval, self.host_intervals.get(host, 0.0))
+        if not interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CrawlFrontier:
+    """
+    URLs waiting to be crawled, deduplicated and queued per host.
+
+    pop() takes turns between hosts, so one big site does not hold up the
+    others while the rate limiter spaces out its requests.
+    """
+
+    def __init__(self, allowed_hosts=None):
+        self.allowed_hosts = allowed_hosts
+        self.queues = OrderedDict()
+        self.seen = set()
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    def add(self, page_url):
+        """
+        Queue page_url unless it was seen before or is off-site; return True if queued
+        """
+        page_url = normalize_url(page_url)
+        if page_url is None or page_url in self.seen:
+            return False
+        host = urlsplit(page_url).netloc
+        if self.allowed_hosts is not None and host not in self.allowed_hosts:
+            return False
+        self.seen.add(page_url)
+        self.queues.setdefault(host, deque()).append(page_url)
+        return True
+
+    def pop(self):
+        """
+        Return the next URL, from the host whose turn it is, or None when empty
+        """
+        if not self.queues:
+            return None
+        host, queue = next(iter(self.queues.items()))
+        page_url = queue.popleft()
+        if queue:
+            self.queues.move_to_end(host)
+        else:
+            del self.queues[host]
+        return page_url
+
+
+class RobotsRules:
+    """
+    robots.txt of each host, fetched once and shared by all worker threads
+    """
+
+    def __init__(self, limiter, timeout=DEFAULT_TIMEOUT):
+        self.limiter = limiter
+        self.timeout = timeout
+        self.parsers = {}
+        self.lock = threading.Lock()
+
+    def allowed(self, session, page_url):
+        parts = urlsplit(page_url)
+        with self.lock:
+            parser = self.parsers.get(parts.netloc)
+        if parser is None:
+            from urllib.robotparser import RobotFileParser
+
+            parser = RobotFileParser()
+            try:
+                response = session.get(f"{parts.scheme}://{parts.netloc}/robots.txt", timeout=self.timeout)
+                lines = response.text.splitlines() if response.status_code == 200 else []
+            except Exception:
+                lines = []
+            # A missing or unreachable robots.txt allows everything
+            parser.parse(lines)
+            delay = parser.crawl_delay(USER_AGENT)
+            if delay:
+                self.limiter.slow_down(parts.netloc, float(delay))
+            with self.lock:
+                parser = self.parsers.setdefault(parts.netloc, parser)
+        return parser.can_fetch(USER_AGENT, page_url)
+
+
+class TitleScraper:
+    """
+    Fetch page titles for many URLs on a thread pool.
+
+    Each worker thread has its own pooled session, so connections to a host are
+    reused across requests. cache (a PageCache or a path) turns on conditional
+    requests.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, per_host_rate=None, cache=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = HostRateLimiter(per_host_rate)
+        self.cache = PageCache(cache) if isinstance(cache, str) else cache
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = make_session(self.concurrency, self.retries, self.backoff)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def fetch(self, page_url, links=False, robots=None):
+        """
+        Return (url, TitleResult, error) for one URL; never raises
+        """
+        try:
+            if robots is not None and not robots.allowed(self._session(), page_url):
+                return page_url, None, "disallowed by robots.txt"
+            self.limiter.wait(urlsplit(page_url).netloc)
+            return page_url, fetch_title(self._session(), page_url, self.timeout, self.cache, links), None
+        except Exception as e:
+            metrics.count("scraper_errors")
+            return page_url, None, str(e)
+
+    def scrape(self, urls):
+        """
+        Yield (url, TitleResult, error) tuples in completion order
+        """
+        urls = iter(urls)
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            # Keep a bounded number of URLs in flight, so huge URL lists
+            # are never turned into futures all at once
+            pending = set()
+            for page_url in urls:
+                pending.add(pool.submit(self.fetch, page_url))
+                if len(pending) >= self.concurrency * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def crawl(self, start_urls, max_pages=DEFAULT_MAX_PAGES, same_site=True, respect_robots=True):
+        """
+        Crawl from start_urls, following links, and yield (url, TitleResult, error).
+
+        Every URL is fetched at most once. With same_site only the hosts of
+        start_urls are visited, and robots.txt is obeyed unless told otherwise.
+        """
+        start_urls = [normalize_url(page_url) for page_url in start_urls]
+        start_urls = [page_url for page_url in start_urls if page_url is not None]
+        allowed_hosts = {urlsplit(page_url).netloc for page_url in start_urls} if same_site else None
+        frontier = CrawlFrontier(allowed_hosts)
+        for page_url in start_urls:
+            frontier.add(page_url)
+        robots = RobotsRules(self.limiter, self.timeout) if respect_robots else None
+
+        scheduled = 0
+        pending = set()
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            while True:
+                while len(pending) < self.concurrency * 2 and scheduled < max_pages:
+                    page_url = frontier.pop()
+                    if page_url is None:
+                        break
+                    pending.add(pool.submit(self.fetch, page_url, True, robots))
+                    scheduled += 1
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_url, result, error = future.result()
+                    if result is not None and result.links:
+                        for link in result.links:
+                            frontier.add(link)
+                    yield page_url, result, error
+
+    def close(self):
+        for session in self._sessions:
+            session.close()
+
+
+def _write_results(results, output_path):
+    """
+    Stream (url, TitleResult, error) tuples to output_path as tab-separated lines.
+
+    Returns (ok_count, error_count, total_bytes_saved, not_modified_count).
+    """
+    ok_count = 0
+    error_count = 0
+    total_saved = 0
+    not_modified_count = 0
+    with open(output_path, "w", encoding="utf-8") as file:
+        for page_url, result, error in results:
+            title = " ".join(result.title.split()) if result and result.title else ""
+            saved = result.bytes_saved if result else None
+            with metrics.timer("scraper_write"):
+                file.write(f"{page_url}\t{title}\t{'' if saved is None else saved}\t{error or ''}\n")
+                file.flush()
+            if error:
+                error_count += 1
+            else:
+                ok_count += 1
+                total_saved += saved or 0
+                not_modified_count += result.not_modified
+    return ok_count, error_count, total_saved, not_modified_count
+
+
+def scrape_titles(urls, output_path, **options):
+    """
+    Scrape titles for urls and stream tab-separated lines to output_path.
+
+    Each line is url, title, bytes saved by the early exit (empty when
+    unknown) and error. Returns (ok_count, error_count, total_bytes_saved,
+    not_modified_count); the last counts pages answered with 304 from the cache.
+    """
+    scraper = TitleScraper(**options)
+    try:
+        return _write_results(scraper.scrape(urls), output_path)
+    finally:
+        scraper.close()
+
+
+def crawl_titles(start_urls, output_path, max_pages=DEFAULT_MAX_PAGES, same_site=True,
+                 respect_robots=True, **options):
+    """
+    Crawl from start_urls and write one line per page, like scrape_titles.
+
+    Requests are spaced out per host (DEFAULT_CRAWL_RATE unless per_host_rate
+    is given); pass cache= so recrawls only download pages that changed.
+    """
+    options.setdefault("per_host_rate", DEFAULT_CRAWL_RATE)
+    scraper = TitleScraper(**options)
+    try:
+        return _write_results(scraper.crawl(start_urls, max_pages, same_site, respect_robots), output_path)
+    finally:
+        scraper.close()
+
+
+def read_urls(path):
+    """
+    Yield non-empty, non-comment lines of a URL list file
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def scrape_single(page_url, output_path, cache=None):
+    import requests
+
+    # Step 2: Send a request and stream the webpage content
+    # Step 3 and 4: Parse only as far as the title tag
+    with requests.Session() as session:
+        result = fetch_title(session, page_url, cache=PageCache(cache) if cache else None)
+    title = result.title
+
+    # Step 5: Save the title to a file
+    with open(output_path, "w", encoding="utf-8") as file:
+        file.write(title)
+
+    print(f"✅ Title saved: {title}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Save webpage titles")
+    parser.add_argument("url", nargs="?", default=url)
+    parser.add_argument("--urls-file", help="file with one URL per line (batch mode)")
+    parser.add_argument("-o", "--output", default=output_file)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--per-host-rate", type=float, default=None,
+                        help=f"max requests per second per host (crawl default: {DEFAULT_CRAWL_RATE})")
+    parser.add_argument("--cache", help="SQLite HTTP cache file; repeat runs send conditional requests")
+    parser.add_argument("--crawl", action="store_true", help="follow links from the URL(s) on the same site")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES, help="pages per crawl")
+    parser.add_argument("--ignore-robots", action="store_true", help="do not read robots.txt when crawling")
+    args = parser.parse_args()
 
-# Step 2: Send a request to get the webpage content
-response = requests.get(url)
+    options = dict(concurrency=args.concurrency, timeout=args.timeout, retries=args.retries, cache=args.cache)
+    if args.per_host_rate is not None:
+        options["per_host_rate"] = args.per_host_rate
+    urls = read_urls(args.urls_file) if args.urls_file else [args.url]
 
-# Step 3: Parse the HTML content
-soup = BeautifulSoup(response.text, 'html.parser')
+    if args.crawl:
+        ok_count, error_count, total_saved, not_modified_count = crawl_titles(
+            urls, args.output, args.max_pages, respect_robots=not args.ignore_robots, **options
+        )
+        print(f"✅ Crawled {ok_count} pages into {args.output} ({error_count} failed, {not_modified_count} unchanged)")
+    elif not args.urls_file:
+        scrape_single(args.url, args.output, args.cache)
+    else:
+        ok_count, error_count, total_saved, not_modified_count = scrape_titles(urls, args.output, **options)
+        print(f"✅ Saved {ok_count} titles to {args.output} "
+              f"({error_count} failed, {total_saved} bytes saved, {not_modified_count} unchanged)")
 
-# Step 4: Get the title tag
-title = soup.title.string
+    if metrics.ENABLED:
+        print(metrics.format_report())
 
-# Step 5: Save the title to a file
-with open("webpage_title.txt", "w", encoding="utf-8") as file:
-    file.write(title)
 
-print(f"✅ Title saved: {title}")
+if __name__ == "__main__":
+    main()
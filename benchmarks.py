@@ -0,0 +1,377 @@
+"""
+Reproducible benchmarks for the hot paths of every tool in this repo.
+
+Each benchmark uses synthetic data from a fixed random seed and reports
+throughput, latency percentiles and peak traced memory. Results are written
+as JSON so runs from different commits can be compared:
+
+    python benchmarks.py                       # full run, writes benchmark_results/<commit>.json
+    python benchmarks.py --quick               # smaller inputs
+    python benchmarks.py --only chatbot email  # some groups only
+    python benchmarks.py --only startup        # cold start of each tool
+    python benchmarks.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from chatbot_loadgen import percentile
+
+SEED = 1234
+
+RESULTS_DIR = "benchmark_results"
+
+# A change larger than this (either way) is flagged by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def measure(function, iterations, items_per_call=1, warmup=3):
+    """
+    Time function() iterations times, then once more under tracemalloc.
+
+    Returns throughput (items/second), latency percentiles in microseconds and
+    peak traced memory in bytes.
+    """
+    for _ in range(warmup):
+        function()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    # Memory is measured in a separate call, so tracing does not skew timings
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "throughput_per_second": iterations * items_per_call / elapsed if elapsed else 0.0,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p90_us": percentile(latencies, 0.90) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "peak_memory_bytes": peak,
+    }
+
+
+# ---------------------------------------------------------------- data generators
+
+
+def chat_inputs_by_rule(rules):
+    """
+    Return {label: message} with one message hitting each rule, plus misses
+    """
+    inputs = {}
+    for index, rule in enumerate(rules):
+        if rule["exact"]:
+            inputs[f"rule{index:02d}_{rule['intent']}"] = rule["exact"][0]
+        elif rule["contains"]:
+            inputs[f"rule{index:02d}_{rule['intent']}"] = f"tell me something about {rule['contains'][0]} please"
+    inputs["default_miss"] = "qwzx plkj mnbv"
+    # Ordinary words share trigrams with the rules, so this runs the whole
+    # fuzzy fallback before missing
+    inputs["sentence_miss"] = "could you recommend a good place to eat dinner near the station tonight"
+    inputs["fuzzy_typo"] = "thnaks"
+    return inputs
+
+
+def make_email_corpus(path, size_bytes, rng):
+    """
+    Write about size_bytes of text with an address roughly every 40 words
+    """
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "mail", "contact", "at", "dot", "com", "user", "reply"]
+    with open(path, "w", encoding="utf-8") as file:
+        written = 0
+        while written < size_bytes:
+            line_words = [rng.choice(words) for _ in range(40)]
+            name = "".join(rng.choice(string.ascii_lowercase) for _ in range(8))
+            line_words[rng.randrange(40)] = f"{name}.{rng.randrange(1000)}@example{rng.randrange(50)}.com"
+            line = " ".join(line_words) + "\n"
+            file.write(line)
+            written += len(line)
+
+
+def make_portfolio(size, rng):
+    """
+    Return ({symbol: price}, {symbol: quantity}) with size positions
+    """
+    prices = {f"SYM{index:06d}": round(rng.uniform(1, 3000), 2) for index in range(size)}
+    portfolio = {symbol: rng.randint(1, 1000) for symbol in prices}
+    return prices, portfolio
+
+
+def make_page(size_bytes, title):
+    head = f"<html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>"
+    return (head + "x" * max(0, size_bytes - len(head) - 14) + "</body></html>").encode("utf-8")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves /page/<size>/<n> as an HTML page of about size bytes
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this small pages
+    # wait on delayed ACKs and the benchmark measures the TCP stack
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        size = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 1024
+        body = make_page(size, f"Page {parts[-1]}")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # The scraper hangs up once it has the title; that is not an error here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_fixture_server():
+    """
+    Start the local HTTP fixture server on a free port
+    """
+    server = FixtureServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------- benchmark groups
+
+
+def bench_chatbot(quick):
+    import chatbot_engine
+
+    results = {}
+    matcher = chatbot_engine.default_matcher
+    iterations = 2000 if quick else 20000
+    for label, message in chat_inputs_by_rule(matcher.rules).items():
+        text = chatbot_engine.normalize_text(message)
+        results[f"chatbot.uncached.{label}"] = measure(lambda: matcher.resolve(text), iterations)
+        results[f"chatbot.cached.{label}"] = measure(lambda: chatbot_engine.get_response(message), iterations)
+    return results
+
+
+def bench_email(quick):
+    import Email_adress_extract
+
+    results = {}
+    rng = random.Random(SEED)
+    sizes = [1, 8] if quick else [1, 16, 64]
+    with tempfile.TemporaryDirectory() as directory:
+        for megabytes in sizes:
+            path = os.path.join(directory, f"corpus_{megabytes}mb.txt")
+            make_email_corpus(path, megabytes * 1024 * 1024, rng)
+
+            def run():
+                for _ in Email_adress_extract.extract_emails_from_path(path):
+                    pass
+
+            result = measure(run, 3, warmup=1)
+            result["megabytes_per_second"] = result["throughput_per_second"] * megabytes
+            results[f"email.stream.{megabytes}mb"] = result
+
+        # The in-memory engines on their own: the plain regex against the '@' prefilter
+        with open(os.path.join(directory, f"corpus_{sizes[0]}mb.txt"), "rb") as file:
+            data = file.read()
+        results["email.engine.regex"] = measure(lambda: Email_adress_extract.BYTES_EMAIL_PATTERN.findall(data), 5)
+        results["email.engine.prefilter"] = measure(lambda: list(Email_adress_extract.find_emails(data)), 5)
+    return results
+
+
+def bench_scraper(quick):
+    import requests
+
+    import Scrape_title
+
+    results = {}
+    server = start_fixture_server()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        for size in [4 * 1024, 256 * 1024]:
+            session = requests.Session()
+            counter = iter(range(10 ** 9))
+            results[f"scraper.fetch_title.{size // 1024}kb"] = measure(
+                lambda: Scrape_title.fetch_title(session, f"{base}/page/{size}/{next(counter)}"),
+                50 if quick else 300,
+            )
+            session.close()
+
+        url_count = 200 if quick else 2000
+        urls = [f"{base}/page/16384/{index}" for index in range(url_count)]
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "titles.txt")
+            results["scraper.batch.16kb"] = measure(
+                lambda: Scrape_title.scrape_titles(urls, output, concurrency=16),
+                1,
+                items_per_call=url_count,
+                warmup=0,
+            )
+    finally:
+        server.shutdown()
+    return results
+
+
+def bench_portfolio(quick):
+    import portfolio_core
+    import price_feed
+
+    results = {}
+    rng = random.Random(SEED)
+    sizes = [10, 1000, 20000] if quick else [10, 1000, 100000]
+    original_provider = portfolio_core.price_provider
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for size in sizes:
+                prices, portfolio = make_portfolio(size, rng)
+                portfolio_core.price_provider = price_feed.make_price_provider(None, prices, ttl=3600)
+                iterations = max(3, 20000 // size) if not quick else max(3, 2000 // size)
+
+                results[f"portfolio.calculate.{size}"] = measure(
+                    lambda: portfolio_core.calculate_portfolio_value(portfolio), iterations, items_per_call=size
+                )
+                total_value, details = portfolio_core.calculate_portfolio_value(portfolio)
+                for kind, save in [("txt", portfolio_core.save_portfolio_txt), ("csv", portfolio_core.save_portfolio_csv)]:
+                    path = os.path.join(directory, f"portfolio.{kind}")
+                    results[f"portfolio.save_{kind}.{size}"] = measure(
+                        lambda: save(details, total_value, path), iterations, items_per_call=size
+                    )
+    finally:
+        portfolio_core.price_provider = original_provider
+    return results
+
+
+# Cold start of each tool: (label, command line arguments after python)
+STARTUP_COMMANDS = [
+    ("import_chatbot_engine", ["-c", "import chatbot_engine"]),
+    ("import_portfolio_core", ["-c", "import portfolio_core"]),
+    ("import_stock_tracker", ["-c", "import stock_tracker"]),
+    ("import_Basic_chatbot", ["-c", "import Basic_chatbot"]),
+    ("import_Scrape_title", ["-c", "import Scrape_title"]),
+    ("import_Email_adress_extract", ["-c", "import Email_adress_extract"]),
+    ("cli_chatbot_help", ["Basic_chatbot.py", "--help"]),
+    ("cli_portfolio_value", ["portfolio_core.py", "value", "AAPL=1"]),
+    ("cli_scraper_help", ["Scrape_title.py", "--help"]),
+    ("cli_email_help", ["Email_adress_extract.py", "--help"]),
+]
+
+
+def bench_startup(quick):
+    results = {}
+    here = os.path.dirname(os.path.abspath(__file__))
+    for label, arguments in STARTUP_COMMANDS:
+        command = [sys.executable] + arguments
+        results[f"startup.{label}"] = measure(
+            lambda: subprocess.run(command, cwd=here, check=True, capture_output=True),
+            3 if quick else 10,
+            warmup=1,
+        )
+    return results
+
+
+GROUPS = {
+    "chatbot": bench_chatbot,
+    "email": bench_email,
+    "scraper": bench_scraper,
+    "portfolio": bench_portfolio,
+    "startup": bench_startup,
+}
+
+
+# ---------------------------------------------------------------- results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(groups, quick):
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "quick": quick,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {},
+    }
+    for name in groups:
+        print(f"Running {name} benchmarks...")
+        report["results"].update(GROUPS[name](quick))
+    return report
+
+
+def compare(old_report, new_report):
+    """
+    Print throughput and p99 changes between two result files
+    """
+    print(f"{'benchmark':55} {'throughput':>12} {'p99':>10}")
+    for name, new in sorted(new_report["results"].items()):
+        old = old_report["results"].get(name)
+        if old is None:
+            print(f"{name:55} {'new':>12}")
+            continue
+        throughput_change = new["throughput_per_second"] / old["throughput_per_second"] - 1 if old["throughput_per_second"] else 0.0
+        p99_change = new["p99_us"] / old["p99_us"] - 1 if old["p99_us"] else 0.0
+        flag = "  <-- regression" if throughput_change < -REGRESSION_THRESHOLD or p99_change > REGRESSION_THRESHOLD else ""
+        print(f"{name:55} {throughput_change:>+11.1%} {p99_change:>+9.1%}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chatbot, extractor, scraper and portfolio hot paths")
+    parser.add_argument("--quick", action="store_true", help="use smaller inputs")
+    parser.add_argument("--only", nargs="+", choices=sorted(GROUPS), help="run only these groups")
+    parser.add_argument("--output", help="result file (default: benchmark_results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as old_file, open(args.compare[1], "r", encoding="utf-8") as new_file:
+            compare(json.load(old_file), json.load(new_file))
+        return
+
+    report = run_benchmarks(args.only or list(GROUPS), args.quick)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    for name, result in report["results"].items():
+        print(f"{name:55} {result['throughput_per_second']:>14,.0f}/s  p50 {result['p50_us']:>10.1f}us  p99 {result['p99_us']:>10.1f}us")
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
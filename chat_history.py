@@ -0,0 +1,140 @@
+"""
+Compact chat history for the Streamlit chatbot.
+
+Turns are __slots__ records with interned role strings, kept in a ring buffer
+of at most `capacity` turns. Older turns are spilled to a JSON-lines file
+(or dropped when no spill file is used) and can still be read back by index.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import weakref
+from array import array
+from collections import deque
+
+USER = sys.intern("user")
+BOT = sys.intern("bot")
+
+
+class ChatTurn:
+    """
+    One message in the conversation
+    """
+
+    __slots__ = ("role", "message")
+
+    def __init__(self, role, message):
+        self.role = sys.intern(role)
+        self.message = message
+
+    def __getitem__(self, key):
+        # Lets old code keep using chat["role"] / chat["message"]
+        if key == "role":
+            return self.role
+        if key == "message":
+            return self.message
+        raise KeyError(key)
+
+    def __eq__(self, other):
+        return isinstance(other, ChatTurn) and self.role == other.role and self.message == other.message
+
+    def __repr__(self):
+        return f"ChatTurn({self.role!r}, {self.message!r})"
+
+
+def _remove_spill_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ChatHistory:
+    """
+    Ring buffer of recent turns with optional spill-to-disk for older ones.
+
+    The spill file is created on the first spill and deleted by close(), by
+    clear(), or when the history is garbage collected.
+    """
+
+    def __init__(self, capacity=200, spill=True, spill_dir=None):
+        self.capacity = capacity
+        self.recent = deque()
+        self.spilled_count = 0
+        self.spill = spill
+        self.spill_dir = spill_dir
+        self.spill_path = None
+        self._finalizer = None
+        # Byte offset of every spilled turn, for reading old turns back by index
+        self._offsets = array("Q")
+
+    def __len__(self):
+        return self.spilled_count + len(self.recent)
+
+    def append(self, role, message):
+        """
+        Add a turn, moving the oldest one out of memory when over capacity
+        """
+        self.recent.append(ChatTurn(role, message))
+        if len(self.recent) > self.capacity:
+            self._spill(self.recent.popleft())
+
+    def _spill(self, turn):
+        if self.spill and self.spill_path is None:
+            handle, self.spill_path = tempfile.mkstemp(prefix="chat_history_", suffix=".jsonl", dir=self.spill_dir)
+            os.close(handle)
+            self._finalizer = weakref.finalize(self, _remove_spill_file, self.spill_path)
+        if self.spill_path is not None:
+            with open(self.spill_path, "ab") as file:
+                self._offsets.append(file.tell())
+                file.write(json.dumps([turn.role, turn.message]).encode("utf-8") + b"\n")
+        self.spilled_count += 1
+
+    def tail(self, count):
+        """
+        Return the last count turns, oldest first (only these need rendering)
+        """
+        count = min(count, len(self))
+        in_memory = min(count, len(self.recent))
+        turns = self.older(len(self) - count, len(self) - in_memory)
+        start = len(self.recent) - in_memory
+        turns.extend(self.recent[index] for index in range(start, len(self.recent)))
+        return turns
+
+    def older(self, start, stop):
+        """
+        Return turns [start, stop) that were spilled to disk
+        """
+        stop = min(stop, self.spilled_count)
+        if start >= stop:
+            return []
+        if self.spill_path is None:
+            # Spilled turns were dropped; nothing to read back
+            return []
+        turns = []
+        with open(self.spill_path, "rb") as file:
+            file.seek(self._offsets[start])
+            for _ in range(stop - start):
+                role, message = json.loads(file.readline())
+                turns.append(ChatTurn(role, message))
+        return turns
+
+    def clear(self):
+        """
+        Forget every turn and delete the spill file
+        """
+        self.recent.clear()
+        self.spilled_count = 0
+        self._offsets = array("Q")
+        self.close()
+
+    def close(self):
+        """
+        Delete the spill file (a later spill creates a new one)
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self.spill_path = None
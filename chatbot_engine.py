@@ -0,0 +1,871 @@
+"""
+Compiled intent matching engine for the rule-based chatbot.
+
+The rules are kept as a plain table (in priority order) and compiled once into
+a hash lookup for exact phrases and a single Aho-Corasick automaton for the
+"contains" phrases, so matching a message costs O(len(message)) no matter how
+many rules are loaded.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+
+import metrics
+
+# Rules live in chatbot_rules.json next to this module; set CHATBOT_RULES_FILE
+# to use another JSON (or YAML) file. The rules are in priority order: the
+# first rule that matches wins, exactly like the old if/elif chain.
+RULES_FILE = os.environ.get(
+    "CHATBOT_RULES_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot_rules.json"),
+)
+
+# Used when the rules file does not set "default_response"
+DEFAULT_RESPONSE = "I'm not sure how to respond to that. Try saying hello, asking how I am, or type 'help' for available commands!"
+
+# Seconds between checks of the rules file for changes
+RULES_CHECK_INTERVAL = 2.0
+
+# Rule index returned when nothing matches
+NO_MATCH = -1
+
+# Responses remembered per compiled matcher
+RESPONSE_CACHE_SIZE = 4096
+
+# Minimum edit-distance similarity (0..1) for a fuzzy match to count, both
+# for each misspelled word and for the whole message against an exact phrase
+FUZZY_THRESHOLD = 0.75
+
+# Stricter similarity for word windows matched against "contains" phrases
+FUZZY_WINDOW_THRESHOLD = 0.85
+
+# Words shorter than this never match fuzzily: with one edit in four letters
+# there is too little left to tell "game" from "name" or "hell" from "hello"
+FUZZY_MIN_WORD_LENGTH = 5
+
+# Shorter words down to this length only match a known word with two
+# neighbouring letters swapped ("yuor"), which keeps both letters as evidence
+FUZZY_MIN_SWAP_LENGTH = 4
+
+# Messages longer than this (normalized characters) skip fuzzy matching
+FUZZY_MAX_INPUT = 160
+
+# Closest known words kept per misspelled word
+FUZZY_CANDIDATES = 8
+
+# Trigrams found in more known words of one length than this are skipped
+# during retrieval
+FUZZY_MAX_POSTINGS = 2000
+
+APOSTROPHE_PATTERN = re.compile(r"['\u2018\u2019`]")
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]|_")
+
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def normalize_text(text):
+    """
+    Fold Unicode forms, case, punctuation and whitespace.
+
+    "  What's   your NAME?! " becomes "whats your name". Rule phrases go
+    through the same function when they are compiled.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = APOSTROPHE_PATTERN.sub("", text)
+    text = PUNCTUATION_PATTERN.sub(" ", text)
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of normalized input -> response, with counters
+    """
+
+    def __init__(self, max_size=RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getstate__(self):
+        # Locks cannot be pickled; a copy sent to a worker process starts
+        # with an empty cache of the same size
+        return {"max_size": self.max_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_size"])
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if not self.max_size:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """
+        Return hit/miss/eviction counters and the current size
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+        }
+
+
+def trigrams(text):
+    """
+    Return the set of character trigrams of text, padded at both ends
+    """
+    padded = f"  {text} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def _distance_within_one(first, second):
+    """
+    Return 0 or 1 if first and second are that many edits apart, otherwise 2
+    """
+    if first == second:
+        return 0
+    if len(first) > len(second):
+        first, second = second, first
+    index = 0
+    for first_char, second_char in zip(first, second):
+        if first_char != second_char:
+            break
+        index += 1
+    if len(first) < len(second):
+        return 1 if first[index:] == second[index + 1:] else 2
+    if first[index + 1:] == second[index + 1:]:
+        return 1
+    swapped = first[index + 1:index + 2] + first[index:index + 1]
+    if swapped == second[index:index + 2] and first[index + 2:] == second[index + 2:]:
+        return 1
+    return 2
+
+
+def edit_distance(first, second, limit):
+    """
+    Return the edit distance of two strings, or limit + 1 once it exceeds limit.
+
+    Only the diagonal band of width limit is filled in and the scan stops as
+    soon as a whole row is over limit, so clearly different strings are
+    rejected after a few rows. Swapping two neighbouring letters ("thnaks")
+    counts as one edit.
+    """
+    over = limit + 1
+    if abs(len(first) - len(second)) > limit:
+        return over
+    if limit <= 1:
+        return _distance_within_one(first, second)
+    # Each edit adds at most one letter to either side's surplus, which is
+    # much cheaper to check than filling in the table
+    surplus = 0
+    for char in set(first):
+        extra = first.count(char) - second.count(char)
+        if extra > 0:
+            surplus += extra
+    if surplus > limit or surplus - len(first) + len(second) > limit:
+        return over
+    columns = len(second)
+    before_previous = None
+    previous = [column if column <= limit else over for column in range(columns + 1)]
+    for row, first_char in enumerate(first, 1):
+        current = [over] * (columns + 1)
+        current[0] = row if row <= limit else over
+        row_best = current[0]
+        for column in range(max(1, row - limit), min(columns, row + limit) + 1):
+            second_char = second[column - 1]
+            cost = min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (first_char != second_char),
+            )
+            if (row > 1 and column > 1 and first_char == second[column - 2]
+                    and first[row - 2] == second_char):
+                cost = min(cost, before_previous[column - 2] + 1)
+            if cost > over:
+                cost = over
+            current[column] = cost
+            if cost < row_best:
+                row_best = cost
+        if row_best > limit:
+            return over
+        before_previous = previous
+        previous = current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant phrase index that scores messages word by word.
+
+    Every distinct word of the trigger phrases is indexed by its character
+    trigrams. A message word that is not a known word is compared (with edit
+    distance) only with the known words sharing enough trigrams to be within
+    the threshold at all, so most words are settled by the trigram counts.
+    A phrase then matches a run of message words of the same length when
+    every word is equal or a close known word, and its score is
+    1 - (sum of word distances) / (length of the longer text).
+
+    The whole message is compared with the "exact" phrases and word windows
+    with the "contains" phrases. Each multi-word phrase is also indexed with
+    its spaces removed, so "thankyou" still finds "thank you".
+    """
+
+    def __init__(self, rules):
+        self.phrases = []
+        self.rule_ids = []
+        self.phrase_words = []
+        self.words = []
+        self.word_ids = {}
+        self.word_postings = {}
+        self.word_lengths = set()
+        # (word count, position, word id) -> phrase ids, one map per kind
+        self.exact_index = {}
+        self.partial_index = {}
+
+        for index, rule in enumerate(rules):
+            for kind, phrase_index in (("exact", self.exact_index), ("contains", self.partial_index)):
+                for phrase in rule.get(kind, []):
+                    phrase = normalize_text(phrase)
+                    if not phrase:
+                        continue
+                    self._add_phrase(phrase, index, phrase_index)
+                    if " " in phrase:
+                        self._add_phrase(phrase.replace(" ", ""), index, phrase_index)
+
+        self.window_sizes = sorted({size for size, _, _ in self.partial_index})
+        self.longest_exact = max((len(self.phrases[phrase_id]) for ids in self.exact_index.values()
+                                  for phrase_id in ids), default=0)
+
+    def _add_phrase(self, phrase, rule, phrase_index):
+        """
+        Index phrase under each of its words and their position
+        """
+        phrase_id = len(self.phrases)
+        self.phrases.append(phrase)
+        self.rule_ids.append(rule)
+        ids = []
+        for word in phrase.split():
+            word_id = self.word_ids.get(word)
+            if word_id is None:
+                word_id = self.word_ids[word] = len(self.words)
+                self.words.append(word)
+                if len(word) >= FUZZY_MIN_WORD_LENGTH:
+                    self.word_lengths.add(len(word))
+                    for gram in trigrams(word):
+                        self.word_postings.setdefault((gram, len(word)), []).append(word_id)
+            ids.append(word_id)
+        self.phrase_words.append(ids)
+        for position, word_id in enumerate(ids):
+            phrase_index.setdefault((len(ids), position, word_id), []).append(phrase_id)
+
+    def word_matches(self, word, threshold=FUZZY_THRESHOLD):
+        """
+        Return {word id: edit distance} of the known words close to word
+        """
+        word_id = self.word_ids.get(word)
+        if word_id is not None:
+            return {word_id: 0}
+        if len(word) < FUZZY_MIN_WORD_LENGTH:
+            if len(word) < FUZZY_MIN_SWAP_LENGTH:
+                return {}
+            matches = {}
+            for index in range(len(word) - 1):
+                swapped = word[:index] + word[index + 1] + word[index] + word[index + 2:]
+                word_id = self.word_ids.get(swapped)
+                if word_id is not None:
+                    matches[word_id] = 1
+            return matches
+
+        # Known words are indexed by trigram and length, so only the lengths
+        # within reach are counted. One edit changes at most four padded
+        # trigrams (a swap of two letters touches four), so a word within
+        # `limit` edits shares at least len + 1 - 4 * limit of them.
+        grams = trigrams(word)
+        size = len(word)
+        postings = self.word_postings
+        shortlist = []
+        lowest = max(FUZZY_MIN_WORD_LENGTH, math.ceil(size * threshold - 1e-9))
+        for length in range(lowest, int(size / threshold + 1e-9) + 1):
+            if length not in self.word_lengths:
+                continue
+            longest = max(size, length)
+            limit = int((1.0 - threshold) * longest + 1e-9)
+            if abs(size - length) > limit:
+                continue
+            lists = []
+            for gram in grams:
+                posting = postings.get((gram, length))
+                if posting is not None and len(posting) <= FUZZY_MAX_POSTINGS:
+                    lists.append(posting)
+            if not lists:
+                continue
+            min_shared = longest + 1 - 4 * limit
+            shortlist.extend((shared, known_id, limit)
+                             for known_id, shared in Counter(chain.from_iterable(lists)).items()
+                             if shared >= min_shared)
+        if len(shortlist) > FUZZY_CANDIDATES * 4:
+            shortlist = heapq.nlargest(FUZZY_CANDIDATES * 4, shortlist)
+
+        words = self.words
+        matches = []
+        for _, known_id, limit in shortlist:
+            distance = edit_distance(word, words[known_id], limit)
+            if distance <= limit:
+                matches.append((distance, known_id))
+        matches.sort()
+        return {known_id: distance for distance, known_id in matches[:FUZZY_CANDIDATES]}
+
+    def _best_phrase(self, matches, text_length, phrase_index, threshold):
+        """
+        Return (score, rule) of the best phrase lining up with a run of
+        message words, given each word's close known words
+        """
+        size = len(matches)
+        # Start from the position with the fewest candidate phrases and
+        # check the other positions directly on each candidate
+        best_ids = None
+        for position, close in enumerate(matches):
+            ids = [phrase_id for word_id in close for phrase_id in phrase_index.get((size, position, word_id), ())]
+            if best_ids is None or len(ids) < len(best_ids):
+                best_ids = ids
+                if not ids:
+                    return 0.0, NO_MATCH
+
+        best = (0.0, NO_MATCH)
+        for phrase_id in best_ids:
+            distance = 0
+            for close, word_id in zip(matches, self.phrase_words[phrase_id]):
+                word_distance = close.get(word_id)
+                if word_distance is None:
+                    break
+                distance += word_distance
+            else:
+                score = 1.0 - distance / max(text_length, len(self.phrases[phrase_id]))
+                rule = self.rule_ids[phrase_id]
+                if score >= threshold and (score > best[0] or (score == best[0] and rule < best[1])):
+                    best = (score, rule)
+        return best
+
+    def lookup(self, text, threshold=FUZZY_THRESHOLD, window_threshold=FUZZY_WINDOW_THRESHOLD):
+        """
+        Return (rule index, similarity) of the best fuzzy match, or (NO_MATCH, 0.0)
+        """
+        # Typo fallback is for short chat messages; long bodies would only
+        # cost time and produce accidental matches
+        if len(text) > FUZZY_MAX_INPUT:
+            return NO_MATCH, 0.0
+
+        words = text.split()
+        seen = {}
+        matches = []
+        for word in words:
+            close = seen.get(word)
+            if close is None:
+                close = seen[word] = self.word_matches(word, threshold)
+            matches.append(close)
+
+        best_score, best_rule = 0.0, NO_MATCH
+        candidates = []
+        if len(text) * threshold <= self.longest_exact:
+            candidates.append(self._best_phrase(matches, len(text), self.exact_index, threshold))
+        window_threshold = max(threshold, window_threshold)
+        for size in self.window_sizes:
+            for start in range(len(words) - size + 1):
+                window = matches[start:start + size]
+                if all(window):
+                    length = sum(len(word) for word in words[start:start + size]) + size - 1
+                    candidates.append(self._best_phrase(window, length, self.partial_index, window_threshold))
+
+        for score, rule in candidates:
+            if rule != NO_MATCH and (score > best_score or (score == best_score and rule < best_rule)):
+                best_score, best_rule = score, rule
+        if best_rule == NO_MATCH:
+            return NO_MATCH, 0.0
+        return best_rule, best_score
+
+
+class IntentMatcher:
+    """
+    Rule table compiled into an exact-match dict plus an Aho-Corasick automaton.
+
+    Each matcher owns its response cache, so compiling a new rule table
+    automatically starts from an empty cache.
+    """
+
+    def __init__(self, rules, cache_size=RESPONSE_CACHE_SIZE, fuzzy_threshold=FUZZY_THRESHOLD,
+                 default_response=DEFAULT_RESPONSE, source=None):
+        started = time.perf_counter()
+        # Rules file this table came from (None when built in code)
+        self.source = source
+        self.rules = list(rules)
+        self.default_response = default_response
+        self.cache = ResponseCache(cache_size)
+        self.fuzzy_threshold = fuzzy_threshold
+        # Typo fallback; pass fuzzy_threshold=None to turn it off
+        self.fuzzy = FuzzyIndex(self.rules) if fuzzy_threshold else None
+        self.responses = [rule["response"] for rule in self.rules]
+        self.intents = [rule["intent"] for rule in self.rules]
+
+        # Unique response texts, so batch results can carry small ids.
+        # The default response always gets the last id.
+        self.response_texts = []
+        text_ids = {}
+        self.response_ids = []
+        for response in self.responses:
+            if response not in text_ids:
+                text_ids[response] = len(self.response_texts)
+                self.response_texts.append(response)
+            self.response_ids.append(text_ids[response])
+        self.default_response_id = len(self.response_texts)
+        self.response_texts.append(default_response)
+
+        # Exact phrases: phrase -> index of the first rule that lists it
+        self.exact = {}
+        for index, rule in enumerate(self.rules):
+            for phrase in rule.get("exact", []):
+                self.exact.setdefault(normalize_text(phrase), index)
+
+        self._build_automaton()
+        self.compile_seconds = time.perf_counter() - started
+        self.compiled_at = time.time()
+        self._stats = None
+
+    def _build_automaton(self):
+        """
+        Build the goto/fail tables for every "contains" phrase
+        """
+        goto = [{}]
+        best = [NO_MATCH]
+
+        for index, rule in enumerate(self.rules):
+            for phrase in rule.get("contains", []):
+                state = 0
+                for char in normalize_text(phrase):
+                    next_state = goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][char] = next_state
+                        goto.append({})
+                        best.append(NO_MATCH)
+                    state = next_state
+                if best[state] == NO_MATCH or index < best[state]:
+                    best[state] = index
+
+        # Breadth-first pass to set failure links and fold in the outputs
+        # of every suffix state, so each state knows its best rule index
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        position = 0
+        while position < len(queue):
+            state = queue[position]
+            position += 1
+            for char, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                inherited = best[fail[next_state]]
+                if inherited != NO_MATCH and (best[next_state] == NO_MATCH or inherited < best[next_state]):
+                    best[next_state] = inherited
+                queue.append(next_state)
+
+        self._goto = goto
+        self._fail = fail
+        self._best = best
+
+    def _scan(self, text, limit):
+        """
+        Return the lowest "contains" rule index below limit found in text
+        """
+        goto = self._goto
+        fail = self._fail
+        best = self._best
+        found = limit
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            hit = best[state]
+            if hit != NO_MATCH and hit < found:
+                found = hit
+                if found == 0:
+                    break
+
+        return found
+
+    def match(self, input_text):
+        """
+        Return the index of the first matching rule, or NO_MATCH
+        """
+        exact_hit = self.exact.get(input_text, len(self.rules))
+        found = self._scan(input_text, exact_hit)
+        return found if found < len(self.rules) else NO_MATCH
+
+    def resolve(self, input_text):
+        """
+        Return the matching rule index, falling back to fuzzy matching
+        """
+        index = self.match(input_text)
+        if index == NO_MATCH and self.fuzzy is not None and input_text:
+            index, _ = self.fuzzy.lookup(input_text, self.fuzzy_threshold)
+        return index
+
+    def match_many(self, inputs):
+        """
+        Match a list of raw inputs, normalizing each distinct text only once
+        """
+        seen = {}
+        intent_ids = array("i")
+        for user_input in inputs:
+            index = seen.get(user_input)
+            if index is None:
+                index = self.resolve(normalize_text(user_input))
+                seen[user_input] = index
+            intent_ids.append(index)
+        return intent_ids
+
+    def respond(self, user_input):
+        """
+        Normalize the input and return the response of the winning rule
+        """
+        input_text = normalize_text(user_input)
+        response = self.cache.get(input_text)
+        if response is None:
+            index = self.resolve(input_text)
+            response = self.default_response if index == NO_MATCH else self.responses[index]
+            self.cache.put(input_text, response)
+        return response
+
+
+def compile_rules(rules, default_response=DEFAULT_RESPONSE, source=None):
+    """
+    Compile a rule table into an IntentMatcher
+    """
+    return IntentMatcher(rules, default_response=default_response, source=source)
+
+
+def load_rules(path):
+    """
+    Read and validate a rules file; return (rules, default_response)
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+
+            data = yaml.safe_load(file)
+        else:
+            data = json.load(file)
+
+    if isinstance(data, list):
+        data = {"rules": data}
+    rules = []
+    for position, rule in enumerate(data.get("rules", [])):
+        if "intent" not in rule or "response" not in rule:
+            raise ValueError(f"rule {position} in {path} needs an intent and a response")
+        for kind in ("exact", "contains"):
+            # A bare string would otherwise be split into one-letter phrases
+            if not isinstance(rule.get(kind, []), list):
+                raise ValueError(f"rule {position} in {path}: {kind} must be a list of phrases")
+        rules.append({
+            "intent": str(rule["intent"]),
+            "exact": [str(phrase) for phrase in rule.get("exact", [])],
+            "contains": [str(phrase) for phrase in rule.get("contains", [])],
+            "response": str(rule["response"]),
+        })
+    return rules, str(data.get("default_response", DEFAULT_RESPONSE))
+
+
+def matcher_memory(matcher):
+    """
+    Approximate bytes used by a compiled matcher's tables
+    """
+    seen = set()
+    total = 0
+    pending = [matcher.__dict__]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif hasattr(item, "__dict__"):
+            pending.append(item.__dict__)
+    return total
+
+
+def compile_stats(matcher):
+    """
+    Return the stats reported for a compiled matcher
+    """
+    # Memory is only measured when asked for, then kept with the matcher
+    if matcher._stats is None:
+        matcher._stats = {
+            "path": matcher.source,
+            "rules": len(matcher.rules),
+            "phrases": len(matcher.fuzzy.phrases) if matcher.fuzzy else None,
+            "compile_seconds": matcher.compile_seconds,
+            "memory_bytes": matcher_memory(matcher),
+            "loaded_at": matcher.compiled_at,
+            "error": None,
+        }
+    return dict(matcher._stats)
+
+
+RULES, _default_response = load_rules(RULES_FILE)
+
+# Compiled once at import time and shared by every caller. Reloads replace
+# this reference in one assignment, so a request that already holds the
+# old matcher simply finishes with it.
+default_matcher = compile_rules(RULES, _default_response, RULES_FILE)
+
+
+@metrics.timed("chatbot_response")
+def get_response(user_input):
+    """
+    Return the chatbot response for user_input using the default matcher
+    """
+    return default_matcher.respond(user_input)
+
+
+def set_rules(rules, default_response=DEFAULT_RESPONSE):
+    """
+    Compile a new rule table and make it the default (this also drops the
+    old matcher's response cache)
+    """
+    global default_matcher
+    default_matcher = compile_rules(rules, default_response)
+    return default_matcher
+
+
+def cache_stats():
+    """
+    Return the response cache counters of the default matcher
+    """
+    return default_matcher.cache.stats()
+
+
+metrics.register_gauges("chatbot_cache", cache_stats)
+
+
+class RuleReloader:
+    """
+    Recompile the rules file when it changes and swap in the new matcher.
+
+    Compiling happens on the watcher thread; callers of get_response are never
+    blocked. A broken file is reported in stats and the old rules stay active.
+    """
+
+    def __init__(self, path=RULES_FILE, interval=RULES_CHECK_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.mtime = self._mtime()
+        # Last failed reload as (error stats, matcher that stayed in use)
+        self.failure = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def check(self):
+        """
+        Reload if the file changed since the last check; return True if reloaded
+        """
+        mtime = self._mtime()
+        if mtime is None or mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        return self.reload()
+
+    def reload(self):
+        """
+        Load, compile and swap in the rules file now
+        """
+        global default_matcher
+        try:
+            rules, default_response = load_rules(self.path)
+            matcher = compile_rules(rules, default_response, self.path)
+        except Exception as e:
+            self.failure = ({"error": str(e), "error_path": self.path, "checked_at": time.time()}, default_matcher)
+            return False
+
+        default_matcher = matcher
+        self.failure = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="chatbot-rule-reloader", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+_reloader = None
+_reloader_lock = threading.Lock()
+
+
+def watch_rules(path=RULES_FILE, interval=RULES_CHECK_INTERVAL):
+    """
+    Start (once per process) the background reloader for the rules file
+    """
+    global _reloader
+    with _reloader_lock:
+        if _reloader is None:
+            _reloader = RuleReloader(path, interval).start()
+    return _reloader
+
+
+def reload_stats():
+    """
+    Return compile time and memory of the rules in use, plus the error of a
+    failed reload that left them in place
+    """
+    matcher = default_matcher
+    stats = compile_stats(matcher)
+    failure = _reloader.failure if _reloader is not None else None
+    if failure is not None and failure[1] is matcher:
+        stats.update(failure[0])
+    return stats
+
+
+class BatchResult:
+    """
+    Columnar result of a batch run: one entry per input in each column
+    """
+
+    def __init__(self, input_index, intent_id, response_id, matcher):
+        self.input_index = input_index
+        self.intent_id = intent_id
+        self.response_id = response_id
+        self.matcher = matcher
+
+    def __len__(self):
+        return len(self.input_index)
+
+    def intent(self, position):
+        """
+        Return the intent name at a position (None when nothing matched)
+        """
+        index = self.intent_id[position]
+        return None if index == NO_MATCH else self.matcher.intents[index]
+
+    def response(self, position):
+        """
+        Return the response text at a position
+        """
+        return self.matcher.response_texts[self.response_id[position]]
+
+    def to_numpy(self):
+        """
+        Return the three columns as NumPy arrays (zero-copy)
+        """
+        import numpy as np
+
+        return (
+            np.frombuffer(self.input_index, dtype=np.int32),
+            np.frombuffer(self.intent_id, dtype=np.int32),
+            np.frombuffer(self.response_id, dtype=np.int32),
+        )
+
+
+def _as_list(inputs):
+    """
+    Turn an iterable, NumPy array or Arrow array of strings into a list
+    """
+    if hasattr(inputs, "to_pylist"):
+        return inputs.to_pylist()
+    if hasattr(inputs, "tolist"):
+        return inputs.tolist()
+    return list(inputs)
+
+
+# Matcher used inside worker processes, set once by _init_worker
+_worker_matcher = None
+
+
+def _init_worker(matcher):
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _match_chunk(chunk):
+    return _worker_matcher.match_many(chunk)
+
+
+def score_batch(inputs, matcher=None, processes=None, chunk_size=100000):
+    """
+    Match many inputs at once and return a columnar BatchResult.
+
+    With processes set, batches larger than chunk_size are split into chunks
+    and matched on a process pool.
+    """
+    matcher = matcher or default_matcher
+    texts = _as_list(inputs)
+
+    if processes and len(texts) > chunk_size:
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        intent_ids = array("i")
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(matcher,)) as pool:
+            for part in pool.map(_match_chunk, chunks):
+                intent_ids.extend(part)
+    else:
+        intent_ids = matcher.match_many(texts)
+
+    response_ids = array("i")
+    lookup = matcher.response_ids
+    default_id = matcher.default_response_id
+    for index in intent_ids:
+        response_ids.append(default_id if index == NO_MATCH else lookup[index])
+
+    return BatchResult(array("i", range(len(texts))), intent_ids, response_ids, matcher)
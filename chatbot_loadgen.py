@@ -0,0 +1,127 @@
+"""
+Load generator for chatbot_server.py.
+
+Opens `sessions` keep-alive connections, each sending `messages` chat
+requests back to back, and reports p50/p99 latency and messages per second.
+Only 200 responses count as messages; any other status is an error and is
+left out of the latency percentiles.
+
+Run with: python chatbot_loadgen.py --port 8080 --sessions 1000 --messages 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+SAMPLE_MESSAGES = [
+    "hello",
+    "how are you",
+    "what's your name",
+    "can you know me",
+    "where i am living",
+    "what about babar azam",
+    "weather",
+    "help",
+    "thanks",
+    "bye",
+    "random text",
+]
+
+
+def percentile(sorted_values, fraction):
+    """
+    Return the value at fraction (0..1) of an already sorted list
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_session(host, port, session_id, messages, latencies, errors):
+    """
+    Send messages chat requests over one connection, recording the latency
+    of each 200 response and the status line of any other
+    """
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        errors.append("connect")
+        return
+    try:
+        for _ in range(messages):
+            body = json.dumps({"session": session_id, "message": random.choice(SAMPLE_MESSAGES)}).encode("utf-8")
+            request = (
+                f"POST /chat HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode("latin-1") + body
+
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            closing = False
+            for line in head.decode("latin-1").split("\r\n"):
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":", 1)[1])
+                elif line.lower().replace(" ", "") == "connection:close":
+                    closing = True
+            await reader.readexactly(length)
+            elapsed = time.perf_counter() - started
+
+            if head.startswith(b"HTTP/1.1 200"):
+                latencies.append(elapsed)
+            else:
+                errors.append(head.split(b"\r\n", 1)[0].decode("latin-1"))
+            if closing:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError) as e:
+        errors.append(type(e).__name__)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, sessions, messages):
+    """
+    Run every session concurrently and return a results dict
+    """
+    latencies = []
+    errors = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(host, port, f"load-{index}", messages, latencies, errors)
+        for index in range(sessions)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "messages": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "messages_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chatbot server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=20)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args.host, args.port, args.sessions, args.messages))
+    print(f"Sessions: {results['sessions']}  Messages: {results['messages']}  Errors: {results['errors']}")
+    print(f"Throughput: {results['messages_per_second']:.0f} messages/second")
+    print(f"Latency p50: {results['p50_ms']:.2f} ms  p99: {results['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Asyncio HTTP/JSON server for the chatbot.
+
+One event loop serves every connection with keep-alive, and each session id
+gets its own small history. Endpoints:
+
+    POST   /chat              {"session": "abc", "message": "hello"}
+    GET    /sessions/<id>     last turns of a session
+    DELETE /sessions/<id>
+    GET    /health
+    GET    /metrics           timers and counters (with APP_METRICS=1)
+
+Backpressure: at most max_connections sockets are served (extra ones get a
+503), writes wait on the transport buffer, and at most max_inflight responses
+may be waiting on slow clients at once. SIGINT/SIGTERM stop accepting
+connections, close idle keep-alive ones and give the rest a grace period to
+finish their current request.
+
+Run with: python chatbot_server.py --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import time
+import uuid
+from collections import OrderedDict, deque
+
+import metrics
+from chatbot_engine import get_response, reload_stats, watch_rules
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    503: "Service Unavailable",
+}
+
+
+class RequestError(Exception):
+    """
+    A request that cannot be read; it is answered with status and the
+    connection is closed
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Session:
+    """
+    Per-session state: the last few turns and when it was last used
+    """
+
+    __slots__ = ("turns", "message_count", "last_seen")
+
+    def __init__(self, history_size):
+        self.turns = deque(maxlen=history_size)
+        self.message_count = 0
+        self.last_seen = time.monotonic()
+
+
+class SessionStore:
+    """
+    LRU of sessions with an idle timeout
+    """
+
+    def __init__(self, max_sessions=100000, idle_timeout=1800.0, history_size=20):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.history_size = history_size
+        self.sessions = OrderedDict()
+
+    def get(self, session_id, create=True):
+        session = self.sessions.get(session_id)
+        if session is None:
+            if not create:
+                return None
+            session = Session(self.history_size)
+            self.sessions[session_id] = session
+            if len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session_id)
+        session.last_seen = time.monotonic()
+        return session
+
+    def expire(self):
+        """
+        Drop sessions idle for longer than idle_timeout
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        # The LRU order means idle sessions are always at the front
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if session.last_seen >= cutoff:
+                break
+            del self.sessions[session_id]
+
+
+class ChatServer:
+    """
+    Asyncio chatbot server; call start() then serve_until_stopped()
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, max_connections=10000, max_inflight=1000,
+                 shutdown_grace=5.0, sessions=None):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.inflight = asyncio.Semaphore(max_inflight)
+        self.shutdown_grace = shutdown_grace
+        self.sessions = sessions or SessionStore()
+        # Connection task -> its writer, and the tasks waiting for a new request
+        self.connections = {}
+        self.idle = set()
+        self.server = None
+        self.stopping = None
+        self.messages_served = 0
+
+    async def start(self):
+        self.stopping = asyncio.Event()
+        self.server = await asyncio.start_server(self._serve_connection, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_until_stopped(self):
+        """
+        Serve until stop() is called, then shut down gracefully
+        """
+        expiry = asyncio.create_task(self._expire_sessions())
+        await self.stopping.wait()
+        expiry.cancel()
+
+        self.server.close()
+        # Idle keep-alive connections would wait for a request forever;
+        # closing them wakes their reader with EOF
+        for task in list(self.idle):
+            self.connections[task].close()
+        if self.connections:
+            # Let busy connections finish their current request
+            tasks = list(self.connections)
+            done, pending = await asyncio.wait(tasks, timeout=self.shutdown_grace)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        # Since Python 3.12 this also waits for every open connection, so it
+        # only comes once they are all gone
+        await self.server.wait_closed()
+
+    def stop(self):
+        self.stopping.set()
+
+    async def _expire_sessions(self):
+        while True:
+            await asyncio.sleep(60)
+            self.sessions.expire()
+
+    async def _serve_connection(self, reader, writer):
+        task = asyncio.current_task()
+        if len(self.connections) >= self.max_connections:
+            await self._write(writer, 503, {"error": "too many connections"}, keep_alive=False)
+            writer.close()
+            return
+
+        self.connections[task] = writer
+        try:
+            while not self.stopping.is_set():
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close" and not self.stopping.is_set()
+                # The slot is held until the response is flushed, which bounds
+                # how many responses can pile up behind slow clients
+                async with self.inflight:
+                    status, payload = self._handle(method, path, body)
+                    await self._write(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except RequestError as e:
+            # The rest of the stream cannot be trusted, but the client still
+            # gets to see why the connection is closing
+            try:
+                await self._write(writer, e.status, {"error": str(e)}, keep_alive=False)
+            except ConnectionError:
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Cancelled after the shutdown grace period; the connection just
+            # closes instead of logging a traceback
+            pass
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+
+    async def _read_request(self, reader):
+        """
+        Return (method, path, headers, body) or None when the client is gone
+        """
+        task = asyncio.current_task()
+        self.idle.add(task)
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise RequestError(431, "request headers too large")
+        finally:
+            self.idle.discard(task)
+        lines = head.decode("latin-1").split("\r\n")
+        request_line = lines[0].split(" ")
+        if len(request_line) != 3 or not request_line[2].startswith("HTTP/"):
+            raise RequestError(400, "malformed request line")
+        method, path, _ = request_line
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = headers.get("content-length", "0")
+        if not (length.isascii() and length.isdigit()):
+            raise RequestError(400, "invalid Content-Length")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413, "body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    async def _write(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        # Waits while the client is not reading fast enough
+        await writer.drain()
+
+    def _handle(self, method, path, body):
+        """
+        Route one request and return (status, payload)
+        """
+        parts = path.split("?")[0].strip("/").split("/")
+        if parts == ["health"] and method == "GET":
+            return 200, {
+                "status": "ok",
+                "sessions": len(self.sessions.sessions),
+                "connections": len(self.connections),
+                "messages": self.messages_served,
+                "rules": reload_stats(),
+            }
+
+        if parts == ["metrics"] and method == "GET":
+            return 200, metrics.snapshot()
+
+        if parts == ["chat"]:
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                data = json.loads(body or b"{}")
+                message = str(data["message"])
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": "expected JSON with a message field"}
+            session_id = str(data.get("session") or uuid.uuid4().hex)
+            session = self.sessions.get(session_id)
+            response = get_response(message)
+            session.turns.append((message, response))
+            session.message_count += 1
+            self.messages_served += 1
+            return 200, {"session": session_id, "response": response, "turn": session.message_count}
+
+        if len(parts) == 2 and parts[0] == "sessions":
+            if method == "DELETE":
+                found = self.sessions.sessions.pop(parts[1], None) is not None
+                return (200 if found else 404), {"deleted": found}
+            if method == "GET":
+                session = self.sessions.get(parts[1], create=False)
+                if session is None:
+                    return 404, {"error": "unknown session"}
+                turns = [{"message": message, "response": response} for message, response in session.turns]
+                return 200, {"session": parts[1], "messages": session.message_count, "turns": turns}
+            return 405, {"error": "method not allowed"}
+
+        return 404, {"error": "not found"}
+
+
+async def run_server(host, port, max_connections, max_inflight):
+    # Rule file edits are compiled in the background and swapped in
+    watch_rules()
+    server = await ChatServer(host, port, max_connections, max_inflight).start()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, server.stop)
+        except NotImplementedError:
+            # Windows event loops do not support signal handlers
+            pass
+    print(f"Chatbot server listening on http://{host}:{server.port}")
+    await server.serve_until_stopped()
+    print("Chatbot server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the chatbot over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-connections", type=int, default=10000)
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run_server(args.host, args.port, args.max_connections, args.max_inflight))
+
+
+if __name__ == "__main__":
+    main()
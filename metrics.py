@@ -0,0 +1,291 @@
+"""
+Opt-in timers and counters for the hot paths of the apps.
+
+Set APP_METRICS=1 to turn them on. When it is off, timed() hands back the
+function unchanged and timer() returns one shared no-op context manager, so
+instrumented code costs next to nothing. Metrics can be read as a dict
+(snapshot()), as Prometheus text (render_prometheus()), over HTTP at
+/metrics and /metrics.json (start_http_server(), or set APP_METRICS_PORT)
+and in a Streamlit sidebar (render_sidebar(st)).
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from functools import wraps
+
+ENABLED = os.environ.get("APP_METRICS", "").lower() in ("1", "true", "yes", "on")
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+PREFIX = "app_"
+
+
+class Timer:
+    """
+    Call count, total and max duration plus a latency histogram
+    """
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+
+
+_timers = {}
+_counters = {}
+_gauge_sources = {}
+_lock = threading.Lock()
+
+
+def observe(name, seconds):
+    """
+    Record one duration for the timer called name
+    """
+    with _lock:
+        timer_stats = _timers.get(name)
+        if timer_stats is None:
+            timer_stats = _timers[name] = Timer()
+        timer_stats.observe(seconds)
+
+
+def count(name, value=1):
+    """
+    Add value to the counter called name
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def register_gauges(name, source):
+    """
+    Report the numbers in the dict returned by source() as gauges name_<key>
+    """
+    _gauge_sources[name] = source
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timing:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def timer(name):
+    """
+    Context manager that times its block as name (a no-op when disabled)
+    """
+    return _Timing(name) if ENABLED else _NULL_TIMER
+
+
+def timed(name):
+    """
+    Decorator that times every call as name.
+
+    Whether metrics are on is decided when the function is decorated; with
+    them off the function is returned as-is.
+    """
+    def decorate(function):
+        if not ENABLED:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorate
+
+
+def snapshot():
+    """
+    Return every timer, counter and gauge as a JSON-friendly dict
+    """
+    with _lock:
+        timers = {
+            name: {
+                "count": stats.count,
+                "total_seconds": stats.total,
+                "mean_ms": stats.total / stats.count * 1000 if stats.count else 0.0,
+                "max_ms": stats.max * 1000,
+            }
+            for name, stats in _timers.items()
+        }
+        counters = dict(_counters)
+    gauges = {}
+    for source_name, source in list(_gauge_sources.items()):
+        for key, value in source().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                gauges[f"{source_name}_{key}"] = value
+    return {"enabled": ENABLED, "timers": timers, "counters": counters, "gauges": gauges}
+
+
+def _metric_name(name):
+    return PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def render_prometheus():
+    """
+    Return all metrics in the Prometheus text exposition format
+    """
+    lines = []
+    with _lock:
+        timers = [(name, stats.count, stats.total, list(stats.buckets)) for name, stats in _timers.items()]
+        counters = list(_counters.items())
+    for name, calls, total, buckets in sorted(timers):
+        metric = _metric_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS, buckets):
+            cumulative += bucket_count
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {calls}')
+        lines.append(f"{metric}_sum {total}")
+        lines.append(f"{metric}_count {calls}")
+    for name, value in sorted(counters):
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    for name, value in sorted(snapshot()["gauges"].items()):
+        metric = _metric_name(name)
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def format_report():
+    """
+    Return a short plain-text table of the timers and counters
+    """
+    data = snapshot()
+    lines = []
+    for name, stats in sorted(data["timers"].items()):
+        lines.append(f"{name:30} {stats['count']:>9} calls  mean {stats['mean_ms']:>9.3f} ms  max {stats['max_ms']:>9.3f} ms")
+    for name, value in sorted({**data["counters"], **data["gauges"]}.items()):
+        lines.append(f"{name:30} {value:>9}")
+    return "\n".join(lines)
+
+
+def reset():
+    """
+    Forget all recorded timings and counts
+    """
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+_http_server = None
+
+
+def start_http_server(port=None, host="127.0.0.1"):
+    """
+    Serve the metrics on a background thread (once per process).
+
+    The port defaults to APP_METRICS_PORT; returns the server, or None when
+    metrics are off, no port is set or the port is taken.
+    """
+    global _http_server
+    port = port if port is not None else os.environ.get("APP_METRICS_PORT")
+    if not ENABLED or port is None:
+        return None
+    # http.server is only imported when metrics are served
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        """
+        Serves /metrics (Prometheus text) and /metrics.json
+        """
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, content_type = render_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+            elif path == "/metrics.json":
+                body, content_type = json.dumps(snapshot()).encode("utf-8"), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    with _lock:
+        if _http_server is None:
+            try:
+                _http_server = ThreadingHTTPServer((host, int(port)), MetricsRequestHandler)
+            except OSError:
+                return None
+            _http_server.daemon_threads = True
+            threading.Thread(target=_http_server.serve_forever, daemon=True).start()
+    return _http_server
+
+
+def render_sidebar(st):
+    """
+    Draw a metrics panel in the Streamlit sidebar (st is the streamlit module)
+    """
+    with st.sidebar.expander("Performance metrics"):
+        if not ENABLED:
+            st.caption("Start the app with APP_METRICS=1 to collect timings.")
+            return
+        data = snapshot()
+        rows = [
+            {"metric": name, "calls": stats["count"], "mean ms": round(stats["mean_ms"], 3), "max ms": round(stats["max_ms"], 3)}
+            for name, stats in sorted(data["timers"].items())
+        ]
+        if rows:
+            st.table(rows)
+        for name, value in sorted({**data["counters"], **data["gauges"]}.items()):
+            st.caption(f"{name}: {value}")
+        if _http_server is not None:
+            st.caption(f"Served at http://{_http_server.server_address[0]}:{_http_server.server_port}/metrics")
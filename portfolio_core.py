@@ -0,0 +1,345 @@
+"""
+Stock portfolio tracker logic without any UI.
+
+Prices, valuation, saving and the console tracker live here, so scripts,
+servers and batch jobs can use them without importing Streamlit.
+stock_tracker.py is the Streamlit front end on top of this module.
+
+Run with: python portfolio_core.py value AAPL=10 TSLA=5 -o portfolio.csv
+"""
+
+import argparse
+import os
+from datetime import datetime
+from itertools import compress
+import metrics
+from portfolio_engine import PriceTable, Positions, book_value, position_values, scenario_totals
+from portfolio_io import export_portfolio, load_portfolio, write_details_csv, write_text_report
+from price_feed import make_price_provider
+
+
+STOCK_PRICES = {
+    "AAPL": 180.50,  # Apple
+    "TSLA": 250.75,  # Tesla
+    "GOOGL": 2800.25, # Google
+    "MSFT": 415.30,   # Microsoft
+    "AMZN": 3200.40,  # Amazon
+    "META": 320.15,   # Meta (Facebook)
+    "NVDA": 450.80,   # NVIDIA
+    "NFLX": 380.90,   # Netflix
+    "AMD": 95.60,     # AMD
+    "INTC": 28.45     # Intel
+}
+
+# All valuation reads prices through this provider. Set PRICE_SOURCE to a
+# .json, .csv or .sqlite file to use other prices, and PRICE_TTL to change
+# how many seconds a cached quote may be reused.
+price_provider = make_price_provider(
+    os.environ.get("PRICE_SOURCE"),
+    STOCK_PRICES,
+    ttl=float(os.environ.get("PRICE_TTL", "60"))
+)
+
+# Problems are printed by default; the Streamlit app points these at
+# st.warning and st.error while it is running
+def show_warning(message):
+    print(f"Warning: {message}")
+
+def show_error(message):
+    print(f"Error: {message}")
+
+# Historical prices for point-in-time valuation, opened on first use
+PRICE_HISTORY_DIR = os.environ.get("PRICE_HISTORY_DIR", "price_history")
+_price_history = None
+
+def get_price_history():
+    """
+    Return the shared memory-mapped price history store
+    """
+    global _price_history
+    if _price_history is None:
+        # Imported here, since only point-in-time valuation needs it
+        from price_history import PriceHistory
+        _price_history = PriceHistory(PRICE_HISTORY_DIR)
+    return _price_history
+
+def value_positions(symbols, quantities, quotes):
+    """
+    Value parallel lists of symbols and quantities against a {symbol: price} dict
+
+    Returns (total_value, portfolio_details, missing symbols); the missing
+    symbols are left out of the total and the details.
+    """
+    price_table = PriceTable.from_dict(quotes)
+    positions = Positions(price_table.ids_for(symbols), quantities)
+    total_value = book_value(price_table, positions)
+
+    known = positions.known()
+    missing = []
+    if not known.all():
+        missing = list(compress(symbols, (~known).tolist()))
+        mask = known.tolist()
+        symbols = list(compress(symbols, mask))
+        quantities = list(compress(quantities, mask))
+
+    prices = price_table.prices[positions.symbol_ids[known]].tolist()
+    stock_values = position_values(price_table, positions)[known].tolist()
+    portfolio_details = [
+        {"stock": stock_symbol, "quantity": quantity, "price": price, "total_value": stock_value}
+        for stock_symbol, quantity, price, stock_value in zip(symbols, quantities, prices, stock_values)
+    ]
+    return total_value, portfolio_details, missing
+
+@metrics.timed("calculate_portfolio_value")
+def calculate_portfolio_value(portfolio, as_of=None):
+    """
+    Calculate total investment value based on stock quantities and prices
+
+    With as_of (a datetime or epoch seconds) the prices come from the
+    price history instead of the current quotes.
+    """
+    # Thin wrapper over portfolio_engine: the positions are valued with one
+    # gather-and-multiply and the old list of dicts is built from the columns
+    symbols = list(portfolio)
+    if as_of is None:
+        quotes = price_provider.get_quotes(symbols)
+    else:
+        quotes = get_price_history().quotes_at(symbols, as_of)
+    total_value, portfolio_details, missing = value_positions(symbols, list(portfolio.values()), quotes)
+    for stock_symbol in missing:
+        show_warning(f"Stock {stock_symbol} not found in our database!")
+    
+    return total_value, portfolio_details
+
+def portfolio_value_over_time(portfolio, start, end):
+    """
+    Return (day timestamps, values) of the portfolio at each day end in [start, end)
+    """
+    return get_price_history().daily_snapshots(portfolio, start, end)
+
+def scenario_portfolio_values(portfolio, shocks, processes=None):
+    """
+    Return the portfolio total under each row of a scenarios x symbols shock matrix
+
+    Columns follow price_provider.symbols(); prices are never mutated, so this
+    is safe to call from many threads at once.
+    """
+    symbols = price_provider.symbols()
+    price_table = PriceTable.from_dict(price_provider.get_quotes(symbols))
+    positions = Positions.from_dict(portfolio, price_table)
+    return scenario_totals(price_table, positions, shocks, processes=processes)
+
+# Function to save portfolio to text file (Key Concept: File Handling)
+@metrics.timed("save_portfolio_txt")
+def save_portfolio_txt(portfolio_details, total_value, filename="portfolio.txt"):
+    """
+    Save portfolio details to a text file
+    """
+    try:
+        with open(filename, "w") as file:
+            # Rows are formatted in batches and written with few write calls
+            write_text_report(portfolio_details, total_value, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), file)
+        
+        return True
+    except Exception as e:
+        show_error(f"Error saving to text file: {e}")
+        return False
+
+# Function to save portfolio to CSV file (Key Concept: File Handling)
+@metrics.timed("save_portfolio_csv")
+def save_portfolio_csv(portfolio_details, total_value, filename="portfolio.csv"):
+    """
+    Save portfolio details to a CSV file (.csv.gz, .csv.bz2 and .csv.xz are compressed)
+    """
+    try:
+        write_details_csv(portfolio_details, total_value, filename)
+        
+        return True
+    except Exception as e:
+        show_error(f"Error saving to CSV file: {e}")
+        return False
+
+# Function to save portfolio in a binary columnar format
+@metrics.timed("save_portfolio_export")
+def save_portfolio_export(portfolio_details, total_value, filename="portfolio.parquet"):
+    """
+    Save portfolio details as .parquet, .arrow/.feather, .npz or (compressed) .csv
+    """
+    try:
+        export_portfolio(portfolio_details, total_value, filename)
+        return True
+    except Exception as e:
+        show_error(f"Error saving to {filename}: {e}")
+        return False
+
+def load_saved_portfolio(filename):
+    """
+    Load a saved portfolio and revalue it with current prices
+    """
+    columns = load_portfolio(filename)
+    return calculate_portfolio_value(columns.to_portfolio())
+
+# Console-based version for demonstration
+def console_portfolio_tracker():
+    """
+    Console version of the portfolio tracker for learning purposes
+    """
+    print("=== STOCK PORTFOLIO TRACKER (Console Version) ===")
+    available_stocks = price_provider.symbols()
+    print("Available stocks:", available_stocks)
+    print("-" * 50)
+    
+    portfolio = {}  # Dictionary to store user's portfolio
+    
+    while True:
+        # Input/Output operations
+        stock_input = input("Enter stock symbol (or 'done' to finish): ").upper().strip()
+        
+        if stock_input == 'DONE':
+            break
+        
+        if stock_input in available_stocks:
+            try:
+                quantity = int(input(f"Enter quantity for {stock_input}: "))
+                if quantity > 0:
+                    portfolio[stock_input] = quantity
+                    print(f"Added {quantity} shares of {stock_input}")
+                else:
+                    print("Quantity must be positive!")
+            except ValueError:
+                print("Please enter a valid number!")
+        else:
+            print(f"Stock {stock_input} not available. Available stocks: {available_stocks}")
+        
+        print("-" * 30)
+    
+    # Calculate and display results
+    if portfolio:
+        total_value, details = calculate_portfolio_value(portfolio)
+        
+        print("\n=== PORTFOLIO SUMMARY ===")
+        for item in details:
+            print(f"{item['stock']}: {item['quantity']} shares × ${item['price']:.2f} = ${item['total_value']:.2f}")
+        
+        print(f"\nTOTAL PORTFOLIO VALUE: ${total_value:.2f}")
+        
+        # File saving option
+        save_option = input("\nSave to file? (txt/csv/csv.gz/parquet/arrow/npz/no): ").lower()
+        if save_option == 'txt':
+            if save_portfolio_txt(details, total_value):
+                print("Portfolio saved to portfolio.txt")
+        elif save_option == 'csv':
+            if save_portfolio_csv(details, total_value):
+                print("Portfolio saved to portfolio.csv")
+        elif save_option in ['csv.gz', 'parquet', 'arrow', 'npz']:
+            if save_portfolio_export(details, total_value, f"portfolio.{save_option}"):
+                print(f"Portfolio saved to portfolio.{save_option}")
+    else:
+        print("No stocks added to portfolio!")
+
+# Example function showing dictionary usage
+def demonstrate_concepts():
+    """
+    Function to demonstrate key programming concepts
+    """
+    print("=== DEMONSTRATING KEY CONCEPTS ===\n")
+    
+    # 1. Dictionary usage
+    print("1. DICTIONARY USAGE:")
+    print("Stock prices dictionary:", STOCK_PRICES)
+    print(f"AAPL price: ${STOCK_PRICES['AAPL']}")
+    print()
+    
+    # 2. Basic arithmetic
+    print("2. BASIC ARITHMETIC:")
+    shares = 10
+    price = STOCK_PRICES['AAPL']
+    total = shares * price
+    print(f"{shares} shares × ${price} = ${total}")
+    print()
+    
+    # 3. Input/Output (simulated)
+    print("3. INPUT/OUTPUT SIMULATION:")
+    sample_portfolio = {"AAPL": 10, "TSLA": 5}
+    print(f"Sample input portfolio: {sample_portfolio}")
+    
+    total_value, details = calculate_portfolio_value(sample_portfolio)
+    print(f"Calculated total value: ${total_value:.2f}")
+    print()
+    
+    # 4. File handling demonstration
+    print("4. FILE HANDLING:")
+    print("Saving sample portfolio to files...")
+    save_portfolio_txt(details, total_value, "demo_portfolio.txt")
+    save_portfolio_csv(details, total_value, "demo_portfolio.csv")
+    print("Files saved successfully!")
+
+def save_portfolio(portfolio_details, total_value, filename):
+    """
+    Save portfolio details in the format given by the filename suffix
+    """
+    if filename.endswith(".txt"):
+        return save_portfolio_txt(portfolio_details, total_value, filename)
+    if filename.endswith(".csv"):
+        return save_portfolio_csv(portfolio_details, total_value, filename)
+    return save_portfolio_export(portfolio_details, total_value, filename)
+
+def parse_positions(items):
+    """
+    Turn SYMBOL=QUANTITY strings into a {symbol: quantity} portfolio
+    """
+    portfolio = {}
+    for item in items:
+        symbol, _, quantity = item.partition("=")
+        if not quantity:
+            raise ValueError(f"expected SYMBOL=QUANTITY, got {item!r}")
+        portfolio[symbol.upper().strip()] = portfolio.get(symbol.upper().strip(), 0) + int(quantity)
+    return portfolio
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stock portfolio tracker (use 'streamlit run stock_tracker.py' for the web UI)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("console", help="enter stocks interactively")
+    commands.add_parser("demo", help="demonstrate the key concepts")
+    commands.add_parser("prices", help="list the available stocks")
+    value_parser = commands.add_parser("value", help="value a portfolio")
+    value_parser.add_argument("positions", nargs="*", help="SYMBOL=QUANTITY pairs")
+    value_parser.add_argument("--file", help="saved portfolio (.csv[.gz], .parquet, .arrow, .npz) to revalue")
+    value_parser.add_argument("-o", "--output", help="save the result (.txt, .csv[.gz], .parquet, .arrow, .npz)")
+    args = parser.parse_args(argv)
+
+    if args.command == "console":
+        console_portfolio_tracker()
+    elif args.command == "demo":
+        demonstrate_concepts()
+    elif args.command == "prices":
+        for stock, price in price_provider.get_quotes(price_provider.symbols()).items():
+            print(f"{stock}: ${price:.2f}")
+    else:
+        if args.file:
+            columns = load_portfolio(args.file)
+            portfolio = columns.to_portfolio()
+        else:
+            portfolio = {}
+        try:
+            for symbol, quantity in parse_positions(args.positions).items():
+                portfolio[symbol] = portfolio.get(symbol, 0) + quantity
+        except ValueError as e:
+            parser.error(str(e))
+        if not portfolio:
+            parser.error("give SYMBOL=QUANTITY pairs or --file")
+
+        total_value, details = calculate_portfolio_value(portfolio)
+        for item in details:
+            print(f"{item['stock']}: {item['quantity']} shares × ${item['price']:.2f} = ${item['total_value']:.2f}")
+        print(f"TOTAL PORTFOLIO VALUE: ${total_value:.2f}")
+        if args.output and save_portfolio(details, total_value, args.output):
+            print(f"✅ Portfolio saved to {args.output}")
+
+    if metrics.ENABLED:
+        print(metrics.format_report())
+
+if __name__ == "__main__":
+    main()
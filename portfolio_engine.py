@@ -0,0 +1,296 @@
+"""
+NumPy-backed portfolio valuation engine.
+
+Symbols are mapped to integer ids once, prices live in a float array indexed
+by id, and positions are (account id, symbol id, quantity) arrays, so a whole
+book (or many accounts at once) is valued with one gather-and-multiply.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+# Symbol id used for symbols that are not in the price table
+UNKNOWN_ID = -1
+
+
+class PriceTable:
+    """
+    Symbols mapped to dense integer ids with a parallel float array of prices
+    """
+
+    def __init__(self, symbols, prices):
+        self.symbols = list(symbols)
+        self.symbol_ids = dict(zip(self.symbols, range(len(self.symbols))))
+        self.prices = np.asarray(prices, dtype=np.float64)
+
+    @classmethod
+    def from_dict(cls, price_dict):
+        """
+        Build a table from a {symbol: price} dict
+        """
+        return cls(price_dict.keys(), list(price_dict.values()))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def ids_for(self, symbols):
+        """
+        Return an int array of ids for symbols (UNKNOWN_ID when missing)
+        """
+        # map() over dict.get keeps the per-symbol work in C
+        ids = map(self.symbol_ids.get, symbols, repeat(UNKNOWN_ID, len(symbols)))
+        return np.fromiter(ids, dtype=np.int64, count=len(symbols))
+
+    def set_price(self, symbol, price):
+        """
+        Update one price in place, adding the symbol if it is new
+        """
+        index = self.symbol_ids.get(symbol)
+        if index is None:
+            self.symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.prices = np.append(self.prices, price)
+        else:
+            self.prices[index] = price
+
+
+class Positions:
+    """
+    Columnar positions: one row per (account, symbol) holding
+    """
+
+    def __init__(self, symbol_ids, quantities, account_ids=None):
+        self.symbol_ids = np.asarray(symbol_ids, dtype=np.int64)
+        self.quantities = np.asarray(quantities, dtype=np.float64)
+        if account_ids is None:
+            account_ids = np.zeros(len(self.symbol_ids), dtype=np.int64)
+        self.account_ids = np.asarray(account_ids, dtype=np.int64)
+
+    @classmethod
+    def from_dict(cls, portfolio, price_table):
+        """
+        Build single-account positions from a {symbol: quantity} dict
+        """
+        symbols = list(portfolio.keys())
+        return cls(price_table.ids_for(symbols), list(portfolio.values()))
+
+    def __len__(self):
+        return len(self.symbol_ids)
+
+    def known(self):
+        """
+        Boolean mask of rows whose symbol is in the price table
+        """
+        return self.symbol_ids != UNKNOWN_ID
+
+
+def position_values(price_table, positions):
+    """
+    Return the value of every row (NaN for unknown symbols)
+    """
+    known = positions.known()
+    values = np.full(len(positions), np.nan)
+    values[known] = price_table.prices[positions.symbol_ids[known]] * positions.quantities[known]
+    return values
+
+
+def book_value(price_table, positions):
+    """
+    Return the total value of all known rows
+    """
+    known = positions.known()
+    return float(np.dot(price_table.prices[positions.symbol_ids[known]], positions.quantities[known]))
+
+
+def account_values(price_table, positions, account_count=None):
+    """
+    Return an array with the total value of every account id
+    """
+    known = positions.known()
+    values = price_table.prices[positions.symbol_ids[known]] * positions.quantities[known]
+    if account_count is None:
+        account_count = int(positions.account_ids.max()) + 1 if len(positions) else 0
+    return np.bincount(positions.account_ids[known], weights=values, minlength=account_count)
+
+
+# Scenario rows handled per matrix product in scenario_totals
+SCENARIO_CHUNK_ROWS = 4096
+
+
+def symbol_exposure(price_table, positions):
+    """
+    Return the value held in each symbol id (zero for symbols not held)
+    """
+    known = positions.known()
+    values = price_table.prices[positions.symbol_ids[known]] * positions.quantities[known]
+    return np.bincount(positions.symbol_ids[known], weights=values, minlength=len(price_table))
+
+
+def sector_shocks(symbol_sector_ids, shocks_by_sector):
+    """
+    Expand a scenarios x sectors shock matrix to scenarios x symbols
+    """
+    return np.asarray(shocks_by_sector, dtype=np.float64)[:, np.asarray(symbol_sector_ids)]
+
+
+def _scenario_chunk(task):
+    """
+    Worker: totals for rows [start, end) of a shock matrix
+    """
+    shocks, start, end, exposure, base_total = task
+    if isinstance(shocks, tuple):
+        # (filename, dtype, shape, offset) of a memmap: map it in the worker
+        filename, dtype, shape, offset = shocks
+        shocks = np.memmap(filename, dtype=dtype, mode="r", shape=shape, offset=offset)
+    return start, base_total + np.asarray(shocks[start:end], dtype=np.float64) @ exposure
+
+
+def _memmap_source(shocks):
+    """
+    Return (filename, dtype, shape, offset) that reopens shocks in a worker,
+    or None when it is not a C-contiguous window of a memmapped file
+    """
+    if not isinstance(shocks, np.memmap) or not shocks.filename or not shocks.flags.c_contiguous:
+        return None
+    # Slices inherit filename and offset from the array they were cut from,
+    # so the real file position comes from the memmap that owns the mapping
+    root = shocks
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not isinstance(root, np.memmap):
+        return None
+    start = shocks.__array_interface__["data"][0] - root.__array_interface__["data"][0]
+    return shocks.filename, shocks.dtype, shocks.shape, root.offset + start
+
+
+def scenario_totals(price_table, positions, shocks, chunk_rows=SCENARIO_CHUNK_ROWS, processes=None):
+    """
+    Revalue a book under every row of a scenarios x symbols shock matrix.
+
+    shocks[s, i] is the relative move of symbol id i in scenario s (0.05 is
+    +5%), so each total is sum(price * (1 + shock) * quantity). The matrix is
+    processed chunk_rows rows at a time to bound temporary memory; with
+    processes set, chunks run on a process pool (memmapped shock matrices
+    are reopened in the workers instead of being copied).
+    """
+    exposure = symbol_exposure(price_table, positions)
+    base_total = float(exposure.sum())
+    scenario_count = shocks.shape[0]
+    if shocks.shape[1] != len(exposure):
+        raise ValueError(f"shock matrix has {shocks.shape[1]} columns, price table has {len(exposure)} symbols")
+
+    totals = np.empty(scenario_count)
+    bounds = [(start, min(start + chunk_rows, scenario_count)) for start in range(0, scenario_count, chunk_rows)]
+
+    if processes and len(bounds) > 1:
+        shared = _memmap_source(shocks)
+        if shared is not None:
+            tasks = [(shared, start, end, exposure, base_total) for start, end in bounds]
+        else:
+            tasks = [(shocks[start:end], 0, end - start, exposure, base_total) for start, end in bounds]
+        with ProcessPoolExecutor(processes) as pool:
+            for (start, end), (_, chunk_totals) in zip(bounds, pool.map(_scenario_chunk, tasks)):
+                totals[start:end] = chunk_totals
+    else:
+        for start, end in bounds:
+            totals[start:end] = base_total + np.asarray(shocks[start:end], dtype=np.float64) @ exposure
+
+    return totals
+
+
+class Portfolio:
+    """
+    Single-account portfolio that keeps its total up to date incrementally.
+
+    Every add/remove/quantity change and price update adjusts the running
+    total in O(1), so the UI never has to revalue the whole portfolio.
+    """
+
+    def __init__(self, prices):
+        # prices is only read when a symbol is first added; after that the
+        # portfolio keeps its own copy and is told about changes via update_price
+        self.price_source = prices
+        self.quantities = {}
+        self.prices = {}
+        self.values = {}
+        self.total_value = 0.0
+
+    def __len__(self):
+        return len(self.quantities)
+
+    def __contains__(self, symbol):
+        return symbol in self.quantities
+
+    def __bool__(self):
+        return bool(self.quantities)
+
+    def set_quantity(self, symbol, quantity):
+        """
+        Set the quantity held of symbol (0 removes it)
+        """
+        if quantity <= 0:
+            self.remove(symbol)
+            return
+        if symbol not in self.prices:
+            self.prices[symbol] = self.price_source[symbol]
+        value = self.prices[symbol] * quantity
+        self.total_value += value - self.values.get(symbol, 0.0)
+        self.quantities[symbol] = quantity
+        self.values[symbol] = value
+
+    def add(self, symbol, quantity):
+        """
+        Buy quantity more shares of symbol
+        """
+        self.set_quantity(symbol, self.quantities.get(symbol, 0) + quantity)
+
+    def remove(self, symbol):
+        """
+        Drop symbol from the portfolio
+        """
+        if symbol in self.quantities:
+            self.total_value -= self.values.pop(symbol)
+            del self.quantities[symbol]
+            del self.prices[symbol]
+            if not self.quantities:
+                # Nothing held: reset so rounding drift cannot build up
+                self.total_value = 0.0
+
+    def update_price(self, symbol, price):
+        """
+        Apply a new price for symbol if it is held
+        """
+        if symbol in self.quantities:
+            value = price * self.quantities[symbol]
+            self.total_value += value - self.values[symbol]
+            self.prices[symbol] = price
+            self.values[symbol] = value
+
+    def details(self):
+        """
+        Return positions as the list of dicts used by calculate_portfolio_value
+        """
+        return [
+            {
+                "stock": symbol,
+                "quantity": quantity,
+                "price": self.prices[symbol],
+                "total_value": self.values[symbol],
+            }
+            for symbol, quantity in self.quantities.items()
+        ]
+
+    def recompute_total(self):
+        """
+        Revalue every position from scratch and return the total
+        """
+        return float(sum(self.prices[symbol] * quantity for symbol, quantity in self.quantities.items()))
+
+    def check_consistency(self, rel_tol=1e-9, abs_tol=1e-6):
+        """
+        Return True if the running total matches a full recompute
+        """
+        expected = self.recompute_total()
+        return abs(self.total_value - expected) <= max(rel_tol * abs(expected), abs_tol)
@@ -0,0 +1,289 @@
+"""
+Columnar portfolio exports and fast loaders.
+
+portfolio_details (the list of dicts built by calculate_portfolio_value) is
+turned into PortfolioColumns once, and every format is written from those
+columns in bulk: compressed CSV, NumPy .npz, and Parquet / Arrow IPC when
+pyarrow is installed. The matching loaders return PortfolioColumns, whose
+to_portfolio() can be passed straight back to calculate_portfolio_value.
+"""
+
+import bz2
+import csv
+import gzip
+import io
+import lzma
+from operator import itemgetter
+
+import numpy as np
+
+CSV_FIELDNAMES = ["Stock_Symbol", "Quantity", "Price_Per_Share", "Total_Value"]
+
+# portfolio_details keys in CSV column order
+DETAIL_FIELDS = itemgetter("stock", "quantity", "price", "total_value")
+
+# Rows formatted per write call in the bulk text writers
+WRITE_BATCH_ROWS = 10000
+
+_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow exports need pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def open_text(filename, mode):
+    """
+    Open filename as text, compressing or decompressing by its suffix
+    """
+    for suffix, opener in _OPENERS.items():
+        if filename.endswith(suffix):
+            return opener(filename, mode + "t", newline="", encoding="utf-8")
+    return open(filename, mode, newline="", encoding="utf-8")
+
+
+class PortfolioColumns:
+    """
+    Portfolio positions stored as parallel columns
+    """
+
+    def __init__(self, symbols, quantities, prices, values):
+        self.symbols = list(symbols)
+        self.quantities = np.asarray(quantities)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+
+    @classmethod
+    def from_details(cls, portfolio_details):
+        """
+        Build columns from a list of {"stock", "quantity", "price", "total_value"} dicts
+        """
+        return cls(
+            [item["stock"] for item in portfolio_details],
+            [item["quantity"] for item in portfolio_details],
+            [item["price"] for item in portfolio_details],
+            [item["total_value"] for item in portfolio_details],
+        )
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def total_value(self):
+        return float(self.values.sum())
+
+    def to_details(self):
+        """
+        Return the list of dicts used by the stock tracker
+        """
+        return [
+            {"stock": symbol, "quantity": quantity, "price": price, "total_value": value}
+            for symbol, quantity, price, value in zip(
+                self.symbols, self.quantities.tolist(), self.prices.tolist(), self.values.tolist()
+            )
+        ]
+
+    def to_portfolio(self):
+        """
+        Return a {symbol: quantity} dict ready to be revalued
+        """
+        return dict(zip(self.symbols, self.quantities.tolist()))
+
+
+def _write_csv_rows(rows, total_value, filename):
+    with open_text(filename, "w") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_FIELDNAMES)
+        writer.writerows(rows)
+        writer.writerow(["TOTAL", "", "", total_value])
+
+
+def write_csv(columns, total_value, filename):
+    """
+    Write the tracker's CSV layout from columns (.gz/.bz2/.xz compress it)
+    """
+    rows = zip(columns.symbols, columns.quantities.tolist(), columns.prices.tolist(), columns.values.tolist())
+    _write_csv_rows(rows, total_value, filename)
+
+
+def write_details_csv(portfolio_details, total_value, filename):
+    """
+    Write the tracker's CSV layout straight from portfolio_details
+    """
+    # One writerows call over tuples; most of the time left is the csv
+    # module formatting floats
+    _write_csv_rows(map(DETAIL_FIELDS, portfolio_details), total_value, filename)
+
+
+def read_csv(filename):
+    """
+    Load a CSV written by write_csv or save_portfolio_csv
+    """
+    with open_text(filename, "r") as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader)
+        rows = [row for row in reader if row and row[0] != "TOTAL"]
+    if not rows:
+        return PortfolioColumns([], [], [], [])
+    symbols, quantities, prices, values = zip(*rows)
+    quantities = [float(quantity) if "." in quantity else int(quantity) for quantity in quantities]
+    return PortfolioColumns(symbols, quantities, np.array(prices, dtype=np.float64), np.array(values, dtype=np.float64))
+
+
+def write_npz(columns, filename):
+    """
+    Save the columns as a NumPy .npz archive (no text parsing on load)
+    """
+    np.savez(
+        filename,
+        symbols=np.array(columns.symbols, dtype=str),
+        quantities=columns.quantities,
+        prices=columns.prices,
+        values=columns.values,
+    )
+
+
+def read_npz(filename):
+    """
+    Load columns saved by write_npz
+    """
+    with np.load(filename) as data:
+        return PortfolioColumns(data["symbols"].tolist(), data["quantities"], data["prices"], data["values"])
+
+
+def _to_arrow_table(columns):
+    pyarrow = _require_pyarrow()
+    return pyarrow.table({
+        "stock": pyarrow.array(columns.symbols, type=pyarrow.string()),
+        "quantity": pyarrow.array(columns.quantities),
+        "price": pyarrow.array(columns.prices),
+        "total_value": pyarrow.array(columns.values),
+    })
+
+
+def _from_arrow_table(table):
+    return PortfolioColumns(
+        table.column("stock").to_pylist(),
+        table.column("quantity").to_numpy(),
+        table.column("price").to_numpy(),
+        table.column("total_value").to_numpy(),
+    )
+
+
+def write_parquet(columns, filename, compression="zstd"):
+    """
+    Save the columns as a Parquet file
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as parquet
+
+    parquet.write_table(_to_arrow_table(columns), filename, compression=compression)
+
+
+def read_parquet(filename):
+    """
+    Load columns saved by write_parquet
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as parquet
+
+    return _from_arrow_table(parquet.read_table(filename))
+
+
+def write_arrow(columns, filename):
+    """
+    Save the columns as an Arrow IPC (Feather v2) file
+    """
+    _require_pyarrow()
+    import pyarrow.feather as feather
+
+    feather.write_feather(_to_arrow_table(columns), filename)
+
+
+def read_arrow(filename):
+    """
+    Load columns saved by write_arrow (memory-mapped when uncompressed)
+    """
+    _require_pyarrow()
+    import pyarrow.feather as feather
+
+    return _from_arrow_table(feather.read_table(filename, memory_map=True))
+
+
+def write_text_report(portfolio_details, total_value, date_text, file):
+    """
+    Write the plain-text report to an open file, batching rows per write call
+    """
+    separator = "-" * 40 + "\n"
+    file.write(f"=== STOCK PORTFOLIO REPORT ===\nDate: {date_text}\n{separator}")
+
+    buffer = io.StringIO()
+    for position, item in enumerate(portfolio_details, 1):
+        buffer.write(
+            f"Stock: {item['stock']}\n"
+            f"Quantity: {item['quantity']}\n"
+            f"Price per share: ${item['price']:.2f}\n"
+            f"Total Value: ${item['total_value']:.2f}\n"
+            f"{separator}"
+        )
+        if position % WRITE_BATCH_ROWS == 0:
+            file.write(buffer.getvalue())
+            buffer = io.StringIO()
+    file.write(buffer.getvalue())
+
+    file.write(f"TOTAL PORTFOLIO VALUE: ${total_value:.2f}\n")
+
+
+READERS = {
+    ".csv": read_csv,
+    ".npz": read_npz,
+    ".parquet": read_parquet,
+    ".arrow": read_arrow,
+    ".feather": read_arrow,
+}
+
+
+def _format_of(filename):
+    """
+    Return the format suffix of filename, ignoring a compression suffix on CSV
+    """
+    name = filename
+    for suffix in _OPENERS:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    for suffix in READERS:
+        if name.endswith(suffix) and (suffix == ".csv" or name == filename):
+            return suffix
+    raise ValueError(f"Unsupported portfolio file format: {filename}")
+
+
+def export_portfolio(portfolio_details, total_value, filename):
+    """
+    Save portfolio_details in the format given by the filename suffix
+    """
+    columns = PortfolioColumns.from_details(portfolio_details)
+    file_format = _format_of(filename)
+    if file_format == ".csv":
+        write_csv(columns, total_value, filename)
+    elif file_format == ".npz":
+        write_npz(columns, filename)
+    elif file_format == ".parquet":
+        write_parquet(columns, filename)
+    else:
+        write_arrow(columns, filename)
+
+
+def load_portfolio(filename):
+    """
+    Load a saved portfolio as PortfolioColumns, choosing the reader by suffix
+    """
+    return READERS[_format_of(filename)](filename)
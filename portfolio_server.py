@@ -0,0 +1,389 @@
+"""
+Headless multi-account portfolio service.
+
+Many accounts live in one shared AccountStore; each account maps to one of a
+fixed number of lock stripes, so requests for different accounts rarely wait
+on each other. Each stripe keeps its positions in columns, which are valued
+with portfolio_engine like any other book. The store is served as a small JSON API over HTTP:
+
+    GET    /accounts                                total value of every account
+    GET    /accounts/<account>                      value the account
+    POST   /accounts/<account>/positions            {"symbol": "AAPL", "quantity": 5} adds shares
+    PUT    /accounts/<account>/positions/<symbol>   {"quantity": 3} sets the quantity
+    DELETE /accounts/<account>/positions/<symbol>   removes the position
+    DELETE /accounts/<account>                      removes the account
+    GET    /health
+    GET    /metrics                                 timers and counters (with APP_METRICS=1)
+
+Run with: python portfolio_server.py --port 8765
+"""
+
+import argparse
+import json
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import numpy as np
+
+import metrics
+from portfolio_core import price_provider, value_positions
+from portfolio_engine import UNKNOWN_ID, PriceTable, Positions, account_values
+
+DEFAULT_STRIPES = 64
+
+# Rows allocated up front per stripe; the columns double when full
+INITIAL_ROWS = 64
+
+
+def parse_quantity(value):
+    """
+    Return a whole share count from a JSON value, rejecting fractions like 2.5
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"quantity must be a whole number, not {value!r}")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"quantity must be a whole number, not {value!r}")
+        return int(value)
+    return int(value)
+
+
+class AccountStripe:
+    """
+    Columnar positions of the accounts that map to one lock stripe.
+
+    Rows are (account id, symbol, quantity) like portfolio_engine.Positions;
+    freed rows and account ids are reused, so churn does not grow the columns.
+    """
+
+    def __init__(self, rows=INITIAL_ROWS):
+        self.lock = threading.Lock()
+        self.account_ids = {}
+        self.accounts = []
+        self.free_accounts = []
+        # (account id, symbol) -> row
+        self.rows = {}
+        self.free_rows = []
+        self.symbols = []
+        self.account_column = np.full(rows, UNKNOWN_ID, dtype=np.int64)
+        self.quantities = np.zeros(rows, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.account_ids)
+
+    def account_id(self, account, create=False):
+        """
+        Return the id of account, adding it when create is set (else None)
+        """
+        account_id = self.account_ids.get(account)
+        if account_id is None and create:
+            if self.free_accounts:
+                account_id = self.free_accounts.pop()
+                self.accounts[account_id] = account
+            else:
+                account_id = len(self.accounts)
+                self.accounts.append(account)
+            self.account_ids[account] = account_id
+        return account_id
+
+    def quantity(self, account_id, symbol):
+        row = self.rows.get((account_id, symbol))
+        return 0 if row is None else int(self.quantities[row])
+
+    def set_row(self, account_id, symbol, quantity):
+        key = (account_id, symbol)
+        row = self.rows.get(key)
+        if row is None:
+            if self.free_rows:
+                row = self.free_rows.pop()
+                self.symbols[row] = symbol
+            else:
+                row = len(self.symbols)
+                if row == len(self.quantities):
+                    self.account_column = np.concatenate(
+                        [self.account_column, np.full(row, UNKNOWN_ID, dtype=np.int64)])
+                    self.quantities = np.concatenate([self.quantities, np.zeros(row, dtype=np.int64)])
+                self.symbols.append(symbol)
+            self.account_column[row] = account_id
+            self.rows[key] = row
+        self.quantities[row] = quantity
+
+    def drop_row(self, account_id, symbol):
+        row = self.rows.pop((account_id, symbol), None)
+        if row is not None:
+            self.account_column[row] = UNKNOWN_ID
+            self.quantities[row] = 0
+            self.symbols[row] = None
+            self.free_rows.append(row)
+
+    def account_rows(self, account_id):
+        """
+        Return the rows held by account_id, in row order
+        """
+        return np.flatnonzero(self.account_column[:len(self.symbols)] == account_id)
+
+    def delete_account(self, account):
+        account_id = self.account_ids.pop(account, None)
+        if account_id is None:
+            return False
+        for row in self.account_rows(account_id).tolist():
+            self.drop_row(account_id, self.symbols[row])
+        self.accounts[account_id] = None
+        self.free_accounts.append(account_id)
+        return True
+
+    def snapshot(self, account_id=None):
+        """
+        Return copies of the (symbols, quantities, account ids) of the used
+        rows, or of one account's rows
+        """
+        if account_id is None:
+            used = np.flatnonzero(self.account_column[:len(self.symbols)] != UNKNOWN_ID)
+        else:
+            used = self.account_rows(account_id)
+        symbols = [self.symbols[row] for row in used.tolist()]
+        return symbols, self.quantities[used], self.account_column[used]
+
+
+class AccountStore:
+    """
+    Accounts split over lock stripes, each holding columnar positions
+    """
+
+    def __init__(self, prices, stripes=DEFAULT_STRIPES):
+        self.prices = prices
+        self.stripes = [AccountStripe() for _ in range(stripes)]
+
+    def _stripe(self, account):
+        # crc32 is stable across processes, unlike hash() of a str
+        return self.stripes[zlib.crc32(account.encode()) % len(self.stripes)]
+
+    def add(self, account, symbol, quantity):
+        """
+        Add quantity shares of symbol to account and return the new quantity
+        """
+        if symbol not in self.prices:
+            raise KeyError(symbol)
+        stripe = self._stripe(account)
+        with stripe.lock:
+            account_id = stripe.account_id(account)
+            current = 0 if account_id is None else stripe.quantity(account_id, symbol)
+            new_quantity = current + quantity
+            if new_quantity <= 0:
+                # Selling out never creates an account
+                if account_id is not None:
+                    stripe.drop_row(account_id, symbol)
+                return 0
+            stripe.set_row(stripe.account_id(account, create=True), symbol, new_quantity)
+            return new_quantity
+
+    def set_quantity(self, account, symbol, quantity):
+        """
+        Set the quantity of symbol in account (0 removes it).
+
+        Returns False when removing from an account that does not exist.
+        """
+        if quantity > 0 and symbol not in self.prices:
+            raise KeyError(symbol)
+        stripe = self._stripe(account)
+        with stripe.lock:
+            if quantity > 0:
+                stripe.set_row(stripe.account_id(account, create=True), symbol, quantity)
+                return True
+            account_id = stripe.account_id(account)
+            if account_id is None:
+                return False
+            stripe.drop_row(account_id, symbol)
+            return True
+
+    def remove(self, account, symbol):
+        return self.set_quantity(account, symbol, 0)
+
+    def delete_account(self, account):
+        stripe = self._stripe(account)
+        with stripe.lock:
+            return stripe.delete_account(account)
+
+    def positions(self, account):
+        """
+        Return a snapshot {symbol: quantity} of the account's positions, or None
+        """
+        stripe = self._stripe(account)
+        with stripe.lock:
+            account_id = stripe.account_id(account)
+            if account_id is None:
+                return None
+            symbols, quantities, _ = stripe.snapshot(account_id)
+        return dict(zip(symbols, quantities.tolist()))
+
+    @metrics.timed("portfolio_account_value")
+    def value(self, account):
+        """
+        Return (total_value, portfolio_details, missing symbols) for account, or None
+        """
+        # Prices are fetched outside the lock, so a slow price feed never
+        # holds up writers on the same stripe
+        stripe = self._stripe(account)
+        with stripe.lock:
+            account_id = stripe.account_id(account)
+            if account_id is None:
+                return None
+            symbols, quantities, _ = stripe.snapshot(account_id)
+        quotes = self.prices.get_quotes(symbols)
+        return value_positions(symbols, quantities.tolist(), quotes)
+
+    @metrics.timed("portfolio_account_totals")
+    def totals(self):
+        """
+        Return {account: total value} for every account
+        """
+        symbols, quantities, account_ids, accounts = [], [], [], []
+        for stripe in self.stripes:
+            with stripe.lock:
+                stripe_symbols, stripe_quantities, stripe_accounts = stripe.snapshot()
+                # Account ids are per stripe, so shift them past the ones
+                # already collected
+                offset = len(accounts)
+                accounts.extend(stripe.accounts)
+            symbols.extend(stripe_symbols)
+            quantities.append(stripe_quantities)
+            account_ids.append(stripe_accounts + offset)
+        price_table = PriceTable.from_dict(self.prices.get_quotes(list(dict.fromkeys(symbols))))
+        positions = Positions(price_table.ids_for(symbols), np.concatenate(quantities or [np.zeros(0)]),
+                              np.concatenate(account_ids or [np.zeros(0, dtype=np.int64)]))
+        values = account_values(price_table, positions, len(accounts)).tolist()
+        return {account: value for account, value in zip(accounts, values) if account is not None}
+
+    def account_count(self):
+        return sum(len(stripe) for stripe in self.stripes)
+
+
+class PortfolioRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API over an AccountStore (set as server.store)
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _route(self):
+        parts = [unquote(part) for part in self.path.split("?")[0].strip("/").split("/")]
+        return parts
+
+    def _account_response(self, account):
+        result = self.server.store.value(account)
+        if result is None:
+            self._send(404, {"error": f"account {account} not found"})
+            return
+        total_value, portfolio_details, missing = result
+        payload = {"account": account, "total_value": total_value, "positions": portfolio_details}
+        if missing:
+            # Same message calculate_portfolio_value warns with
+            payload["warnings"] = [f"Stock {symbol} not found in our database!" for symbol in missing]
+        self._send(200, payload)
+
+    def _handle(self, method):
+        store = self.server.store
+        parts = self._route()
+        try:
+            if method == "GET" and parts == ["health"]:
+                self._send(200, {"status": "ok", "accounts": store.account_count()})
+            elif method == "GET" and parts == ["metrics"]:
+                self._send(200, metrics.snapshot())
+            elif method == "GET" and parts == ["accounts"]:
+                self._send(200, {"accounts": store.totals()})
+            elif len(parts) == 2 and parts[0] == "accounts":
+                if method == "GET":
+                    self._account_response(parts[1])
+                elif method == "DELETE":
+                    found = store.delete_account(parts[1])
+                    self._send(200 if found else 404, {"deleted": found})
+                else:
+                    self._send(405, {"error": "method not allowed"})
+            elif len(parts) == 3 and parts[0] == "accounts" and parts[2] == "positions" and method == "POST":
+                data = self._read_json()
+                quantity = store.add(parts[1], str(data["symbol"]).upper(), parse_quantity(data["quantity"]))
+                self._send(200, {"account": parts[1], "symbol": str(data["symbol"]).upper(), "quantity": quantity})
+            elif len(parts) == 4 and parts[0] == "accounts" and parts[2] == "positions":
+                symbol = parts[3].upper()
+                if method not in ("PUT", "DELETE"):
+                    self._send(405, {"error": "method not allowed"})
+                    return
+                if method == "PUT":
+                    found = store.set_quantity(parts[1], symbol, parse_quantity(self._read_json()["quantity"]))
+                else:
+                    found = store.remove(parts[1], symbol)
+                if found:
+                    self._account_response(parts[1])
+                else:
+                    self._send(404, {"error": f"account {parts[1]} not found"})
+            else:
+                self._send(404, {"error": "not found"})
+        except KeyError as e:
+            self._send(400, {"error": f"unknown stock or missing field: {e}"})
+        except (ValueError, TypeError) as e:
+            self._send(400, {"error": f"bad request: {e}"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class PortfolioServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the shared AccountStore
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, store=None):
+        super().__init__(address, PortfolioRequestHandler)
+        self.store = store if store is not None else AccountStore(price_provider)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve many portfolios over a JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stripes", type=int, default=DEFAULT_STRIPES)
+    args = parser.parse_args()
+
+    server = PortfolioServer((args.host, args.port), AccountStore(price_provider, args.stripes))
+    print(f"Portfolio server listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
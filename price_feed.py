@@ -0,0 +1,260 @@
+"""
+Price providers for the stock tracker.
+
+Every provider answers bulk get_quotes(symbols) calls with a {symbol: price}
+dict (unknown symbols are left out). CachedPriceProvider wraps any provider
+with a TTL/LRU cache and coalesces concurrent requests for the same symbol.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class PriceProvider:
+    """
+    Base class: subclasses implement get_quotes() and symbols()
+    """
+
+    def get_quotes(self, symbols):
+        raise NotImplementedError
+
+    def symbols(self):
+        raise NotImplementedError
+
+    def __getitem__(self, symbol):
+        quotes = self.get_quotes([symbol])
+        if symbol not in quotes:
+            raise KeyError(symbol)
+        return quotes[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self.get_quotes([symbol])
+
+
+class StaticPriceProvider(PriceProvider):
+    """
+    Prices from an in-memory {symbol: price} dict
+    """
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get_quotes(self, symbols):
+        prices = self.prices
+        return {symbol: prices[symbol] for symbol in symbols if symbol in prices}
+
+    def symbols(self):
+        return list(self.prices.keys())
+
+
+class FilePriceProvider(PriceProvider):
+    """
+    Prices from a JSON ({"AAPL": 180.5, ...}) or CSV (symbol,price) file.
+
+    The file is re-read when its modification time changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        self._prices = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        mtime = os.path.getmtime(self.path)
+        with self._lock:
+            if mtime == self._mtime:
+                return self._prices
+            if self.path.endswith(".json"):
+                with open(self.path, "r", encoding="utf-8") as file:
+                    prices = {symbol: float(price) for symbol, price in json.load(file).items()}
+            else:
+                with open(self.path, "r", newline="", encoding="utf-8") as file:
+                    prices = {row[0]: float(row[1]) for row in csv.reader(file) if row and row[0] != "symbol"}
+            self._prices = prices
+            self._mtime = mtime
+            return prices
+
+    def get_quotes(self, symbols):
+        prices = self._load()
+        return {symbol: prices[symbol] for symbol in symbols if symbol in prices}
+
+    def symbols(self):
+        return list(self._load().keys())
+
+
+class SQLitePriceProvider(PriceProvider):
+    """
+    Prices from a SQLite table quotes(symbol TEXT PRIMARY KEY, price REAL)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(self.path) as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS quotes (symbol TEXT PRIMARY KEY, price REAL NOT NULL)")
+
+    def _connect(self):
+        # One short-lived connection per call keeps the provider thread-safe
+        return sqlite3.connect(self.path)
+
+    def get_quotes(self, symbols):
+        symbols = list(symbols)
+        quotes = {}
+        with self._connect() as connection:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(symbols), 500):
+                batch = symbols[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = connection.execute(f"SELECT symbol, price FROM quotes WHERE symbol IN ({placeholders})", batch)
+                quotes.update(rows)
+        return quotes
+
+    def symbols(self):
+        with self._connect() as connection:
+            return [row[0] for row in connection.execute("SELECT symbol FROM quotes ORDER BY rowid")]
+
+    def set_quotes(self, prices):
+        """
+        Insert or update prices from a {symbol: price} dict
+        """
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT INTO quotes (symbol, price) VALUES (?, ?) ON CONFLICT(symbol) DO UPDATE SET price = excluded.price",
+                prices.items(),
+            )
+
+
+class _Fetch:
+    """
+    One in-flight upstream request that other callers can wait on
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.quotes = {}
+        self.error = None
+
+
+# Cached in place of a price for symbols the upstream does not know
+_MISSING = object()
+
+
+class CachedPriceProvider(PriceProvider):
+    """
+    TTL + LRU cache in front of another provider.
+
+    Quotes older than ttl seconds are refetched, symbols the upstream does not
+    know are remembered as missing for ttl seconds too, and a symbol that is
+    already being fetched by another thread is waited on instead of being
+    requested again. With max_size set at most that many symbols are kept;
+    by default the cache holds the whole working set.
+    """
+
+    def __init__(self, provider, ttl=60.0, max_size=None):
+        self.provider = provider
+        self.ttl = ttl
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+
+    def get_quotes(self, symbols):
+        quotes = {}
+        to_fetch = []
+        waits = []
+        now = time.monotonic()
+        bounded = self.max_size is not None
+
+        # dict.fromkeys drops repeated symbols but keeps their order
+        unique = dict.fromkeys(symbols)
+        cutoff = now - self.ttl
+
+        with self.lock:
+            lookup = self.cache.get
+            for symbol in unique:
+                entry = lookup(symbol)
+                if entry is not None and entry[1] >= cutoff:
+                    if bounded:
+                        self.cache.move_to_end(symbol)
+                    if entry[0] is not _MISSING:
+                        quotes[symbol] = entry[0]
+                elif symbol in self.inflight:
+                    waits.append((symbol, self.inflight[symbol]))
+                else:
+                    to_fetch.append(symbol)
+            self.hits += len(unique) - len(to_fetch)
+            self.misses += len(to_fetch)
+
+            fetch = _Fetch()
+            for symbol in to_fetch:
+                self.inflight[symbol] = fetch
+            if to_fetch:
+                self.upstream_calls += 1
+
+        if to_fetch:
+            try:
+                fetch.quotes = self.provider.get_quotes(to_fetch)
+            except BaseException as e:
+                fetch.error = e
+                raise
+            finally:
+                fetched_at = time.monotonic()
+                with self.lock:
+                    for symbol in to_fetch:
+                        self.inflight.pop(symbol, None)
+                    if fetch.error is None:
+                        for symbol in to_fetch:
+                            self.cache[symbol] = (fetch.quotes.get(symbol, _MISSING), fetched_at)
+                            if bounded:
+                                self.cache.move_to_end(symbol)
+                        while bounded and len(self.cache) > self.max_size:
+                            self.cache.popitem(last=False)
+                fetch.done.set()
+            quotes.update(fetch.quotes)
+
+        for symbol, other in waits:
+            other.done.wait()
+            if other.error is not None:
+                # The caller that did the fetch gets the error too
+                raise other.error
+            if symbol in other.quotes:
+                quotes[symbol] = other.quotes[symbol]
+
+        return quotes
+
+    def symbols(self):
+        return self.provider.symbols()
+
+    def invalidate(self, symbols=None):
+        """
+        Forget cached quotes for symbols (or all of them)
+        """
+        with self.lock:
+            if symbols is None:
+                self.cache.clear()
+            else:
+                for symbol in symbols:
+                    self.cache.pop(symbol, None)
+
+
+def make_price_provider(source=None, default_prices=None, ttl=60.0):
+    """
+    Build a cached provider from a source path, or from default_prices.
+
+    Paths ending in .db/.sqlite use SQLite; .json/.csv files use FilePriceProvider.
+    """
+    if not source:
+        provider = StaticPriceProvider(default_prices or {})
+    elif source.endswith((".db", ".sqlite", ".sqlite3")):
+        provider = SQLitePriceProvider(source)
+    else:
+        provider = FilePriceProvider(source)
+    return CachedPriceProvider(provider, ttl=ttl)
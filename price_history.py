@@ -0,0 +1,222 @@
+"""
+Append-only historical price store backed by memory-mapped files.
+
+Each symbol has two files in the store directory: SYMBOL.ts (int64 epoch
+seconds, sorted) and SYMBOL.px (float64 prices). Reads map the files with
+np.memmap, so nothing is copied, and point-in-time lookups are binary searches.
+"""
+
+import csv
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+TIMESTAMP_DTYPE = np.dtype("<i8")
+PRICE_DTYPE = np.dtype("<f8")
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def to_epoch(value):
+    """
+    Convert a datetime (naive means UTC), date string or number to epoch seconds
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def to_epochs(values):
+    """
+    Convert a sequence or array of times to an int64 array of epoch seconds
+    """
+    array = np.atleast_1d(np.asarray(values))
+    if array.dtype.kind in "iuf":
+        return array.astype(TIMESTAMP_DTYPE)
+    return np.asarray([to_epoch(value) for value in array.tolist()], dtype=TIMESTAMP_DTYPE)
+
+
+class _Series:
+    """
+    Memory-mapped timestamps and prices of one symbol
+    """
+
+    def __init__(self, timestamps, prices, size):
+        self.timestamps = timestamps
+        self.prices = prices
+        self.size = size
+
+
+class PriceHistory:
+    """
+    Tick/bar store with one pair of memory-mapped arrays per symbol
+    """
+
+    def __init__(self, directory):
+        # The directory is only created by the first append, so opening a
+        # store just to read from it leaves the file system alone
+        self.directory = directory
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, symbol):
+        base = os.path.join(self.directory, symbol)
+        return base + ".ts", base + ".px"
+
+    def symbols(self):
+        """
+        Return every symbol that has history
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-3] for name in os.listdir(self.directory) if name.endswith(".ts"))
+
+    def append(self, symbol, timestamps, prices):
+        """
+        Append ticks for symbol; timestamps must not go back in time
+        """
+        timestamps = to_epochs(timestamps)
+        prices = np.atleast_1d(np.asarray(prices, dtype=PRICE_DTYPE))
+        if len(timestamps) != len(prices):
+            raise ValueError("timestamps and prices must have the same length")
+        if len(timestamps) == 0:
+            return
+        if np.any(np.diff(timestamps) < 0):
+            raise ValueError("timestamps must be sorted")
+
+        with self._lock:
+            series = self._load(symbol)
+            if series is not None and series.size and timestamps[0] < series.timestamps[-1]:
+                raise ValueError(f"{symbol}: cannot append ticks older than the last stored tick")
+
+            os.makedirs(self.directory, exist_ok=True)
+            ts_path, px_path = self._paths(symbol)
+            # Prices are written first, so a concurrent reader (which trusts
+            # the timestamp file length) never sees a timestamp without a price
+            with open(px_path, "ab") as file:
+                file.write(prices.tobytes())
+            with open(ts_path, "ab") as file:
+                file.write(timestamps.tobytes())
+            self._series.pop(symbol, None)
+
+    def _load(self, symbol):
+        """
+        Return the (possibly cached) memory-mapped series for symbol, or None
+        """
+        ts_path, px_path = self._paths(symbol)
+        try:
+            size = os.path.getsize(ts_path) // TIMESTAMP_DTYPE.itemsize
+        except OSError:
+            return None
+
+        series = self._series.get(symbol)
+        if series is not None and series.size == size:
+            return series
+
+        if size == 0:
+            series = _Series(np.empty(0, TIMESTAMP_DTYPE), np.empty(0, PRICE_DTYPE), 0)
+        else:
+            series = _Series(
+                np.memmap(ts_path, dtype=TIMESTAMP_DTYPE, mode="r", shape=(size,)),
+                np.memmap(px_path, dtype=PRICE_DTYPE, mode="r", shape=(size,)),
+                size,
+            )
+        self._series[symbol] = series
+        return series
+
+    def series(self, symbol):
+        """
+        Return (timestamps, prices) views of all history for symbol
+        """
+        series = self._load(symbol)
+        if series is None:
+            raise KeyError(symbol)
+        return series.timestamps, series.prices
+
+    def range(self, symbol, start, end):
+        """
+        Return (timestamps, prices) views for start <= timestamp < end
+        """
+        timestamps, prices = self.series(symbol)
+        low = np.searchsorted(timestamps, to_epoch(start), side="left")
+        high = np.searchsorted(timestamps, to_epoch(end), side="left")
+        return timestamps[low:high], prices[low:high]
+
+    def prices_at(self, symbol, when):
+        """
+        Return the last price at or before each time in when (NaN before the first tick)
+        """
+        when = to_epochs(when)
+        series = self._load(symbol)
+        if series is None or series.size == 0:
+            return np.full(len(when), np.nan)
+        index = np.searchsorted(series.timestamps, when, side="right") - 1
+        result = np.asarray(series.prices)[np.maximum(index, 0)].astype(np.float64)
+        result[index < 0] = np.nan
+        return result
+
+    def price_at(self, symbol, when):
+        """
+        Return the last price at or before when, or None if there is none
+        """
+        price = self.prices_at(symbol, [when])[0]
+        return None if np.isnan(price) else float(price)
+
+    def quotes_at(self, symbols, when):
+        """
+        Return {symbol: price} as of when, leaving out symbols without a price
+        """
+        quotes = {}
+        for symbol in symbols:
+            price = self.price_at(symbol, when)
+            if price is not None:
+                quotes[symbol] = price
+        return quotes
+
+    def values_over(self, portfolio, when):
+        """
+        Value a {symbol: quantity} portfolio at every time in when.
+
+        Symbols without a price yet at a given time count as zero.
+        """
+        when = to_epochs(when)
+        totals = np.zeros(len(when))
+        for symbol, quantity in portfolio.items():
+            prices = self.prices_at(symbol, when)
+            totals += np.nan_to_num(prices) * quantity
+        return totals
+
+    def daily_snapshots(self, portfolio, start, end):
+        """
+        Return (day timestamps, portfolio values) for each UTC day end in [start, end)
+        """
+        first_day = to_epoch(start) // SECONDS_PER_DAY
+        last_day = (to_epoch(end) - 1) // SECONDS_PER_DAY
+        # Value at the last second of each day
+        days = np.arange(first_day, last_day + 1, dtype=TIMESTAMP_DTYPE) * SECONDS_PER_DAY
+        return days, self.values_over(portfolio, days + SECONDS_PER_DAY - 1)
+
+    def import_csv(self, path):
+        """
+        Append ticks from a CSV of symbol,timestamp,price rows (sorted per symbol)
+        """
+        rows = {}
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            for row in csv.reader(file):
+                if not row or row[0] == "symbol":
+                    continue
+                symbol, timestamp, price = row[0], row[1], float(row[2])
+                timestamp = int(timestamp) if timestamp.lstrip("-").isdigit() else to_epoch(timestamp)
+                series = rows.setdefault(symbol, ([], []))
+                series[0].append(timestamp)
+                series[1].append(price)
+        for symbol, (timestamps, prices) in rows.items():
+            self.append(symbol, timestamps, prices)
+        return sum(len(timestamps) for timestamps, _ in rows.values())
+
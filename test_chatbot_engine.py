@@ -0,0 +1,242 @@
+"""
+Tests for the compiled intent matcher and its typo fallback.
+
+The compiled matcher is checked against the if/elif chain it replaced.
+
+Run with: python -m pytest -q test_chatbot_engine.py
+"""
+
+import json
+import os
+import random
+import string
+import tempfile
+import unittest
+
+import chatbot_engine
+from chatbot_engine import IntentMatcher, NO_MATCH, edit_distance, normalize_text
+
+SEED = 20240501
+
+
+def reference_distance(first, second):
+    """
+    Full-table edit distance, counting a swap of neighbouring letters as one edit
+    """
+    table = [[0] * (len(second) + 1) for _ in range(len(first) + 1)]
+    for row in range(len(first) + 1):
+        table[row][0] = row
+    for column in range(len(second) + 1):
+        table[0][column] = column
+    for row in range(1, len(first) + 1):
+        for column in range(1, len(second) + 1):
+            table[row][column] = min(
+                table[row - 1][column] + 1,
+                table[row][column - 1] + 1,
+                table[row - 1][column - 1] + (first[row - 1] != second[column - 1]),
+            )
+            if (row > 1 and column > 1 and first[row - 1] == second[column - 2]
+                    and first[row - 2] == second[column - 1]):
+                table[row][column] = min(table[row][column], table[row - 2][column - 2] + 1)
+    return table[-1][-1]
+
+
+def if_elif_match(rules, input_text):
+    """
+    The original if/elif chain over a rule table: the first rule whose exact
+    phrases contain the input, or one of whose phrases occurs in it, wins
+    """
+    for index, rule in enumerate(rules):
+        if input_text in [normalize_text(phrase) for phrase in rule["exact"]]:
+            return index
+        if any(normalize_text(phrase) in input_text for phrase in rule["contains"]):
+            return index
+    return NO_MATCH
+
+
+def original_response(user_input):
+    """
+    get_chatbot_response as it was written before the rules moved to JSON,
+    with the responses replaced by intents
+    """
+    input_text = user_input.lower().strip()
+    if input_text in ["hello", "hi", "hey", "good morning", "good afternoon"]:
+        return "greeting"
+    elif input_text in ["how are you", "how are you?", "how do you do", "how's it going"]:
+        return "how_are_you"
+    elif input_text in ["bye", "goodbye", "see you later", "see ya", "farewell"]:
+        return "goodbye"
+    elif input_text in ["what's your name", "what is your name", "who are you"]:
+        return "name"
+    elif input_text in ["thank you", "thanks", "thank you very much"]:
+        return "thanks"
+    elif "weather" in input_text:
+        return "weather"
+    elif input_text in ["help", "what can you do", "commands"]:
+        return "help"
+    elif "time" in input_text or "what time" in input_text:
+        return "time"
+    elif "age" in input_text or "old are you" in input_text:
+        return "age"
+    elif "can you know me" in input_text or "do you know me" in input_text or "who am i" in input_text:
+        return "know_me"
+    elif "where i am living" in input_text or "where do i live" in input_text or "my location" in input_text:
+        return "location"
+    elif "babar azam" in input_text or "what about babar azam" in input_text or "babar" in input_text:
+        return "babar_azam"
+    elif "cricket" in input_text:
+        return "cricket"
+    elif "pakistan" in input_text:
+        return "pakistan"
+    else:
+        return None
+
+
+class CompiledMatchTest(unittest.TestCase):
+    def compiled_intent(self, matcher, text):
+        index = matcher.match(normalize_text(text))
+        return None if index == NO_MATCH else matcher.intents[index]
+
+    def test_default_rules_match_the_original_chain(self):
+        matcher = IntentMatcher(chatbot_engine.RULES, fuzzy_threshold=None)
+        phrases = [phrase for rule in chatbot_engine.RULES for kind in ("exact", "contains")
+                   for phrase in rule[kind] if "'" not in phrase and "?" not in phrase]
+        inputs = ["", " ", "\t \n", "random text", "how are you?", "HELLO", "  hi  ", "message"]
+        inputs.extend(phrases)
+        rng = random.Random(SEED)
+        for _ in range(3000):
+            # Several phrases in one message, so later rules overlap earlier ones
+            inputs.append(" ".join(rng.choice(phrases + ["the", "stage", "xx"]) for _ in range(rng.randint(1, 4))))
+        for text in inputs:
+            self.assertEqual(self.compiled_intent(matcher, text), original_response(text), repr(text))
+
+    def test_random_rule_tables_keep_first_match_priority(self):
+        rng = random.Random(SEED + 1)
+        # A tiny alphabet makes phrases overlap and contain each other
+        def phrase():
+            return " ".join("".join(rng.choice("ab") for _ in range(rng.randint(1, 3)))
+                            for _ in range(rng.randint(1, 2)))
+
+        for _ in range(200):
+            rules = [{"intent": f"intent{index}", "exact": [phrase() for _ in range(rng.randint(0, 2))],
+                      "contains": [phrase() for _ in range(rng.randint(0, 2))], "response": str(index)}
+                     for index in range(rng.randint(1, 8))]
+            matcher = IntentMatcher(rules, fuzzy_threshold=None)
+            for _ in range(50):
+                text = normalize_text(" ".join(phrase() for _ in range(rng.randint(0, 3))))
+                self.assertEqual(matcher.match(text), if_elif_match(rules, text), (rules, text))
+
+
+class EditDistanceTest(unittest.TestCase):
+    def test_matches_full_table_within_limit(self):
+        rng = random.Random(SEED)
+        for _ in range(20000):
+            first = "".join(rng.choice("abcd") for _ in range(rng.randrange(0, 9)))
+            second = "".join(rng.choice("abcd") for _ in range(rng.randrange(0, 9)))
+            expected = reference_distance(first, second)
+            for limit in range(4):
+                distance = edit_distance(first, second, limit)
+                if expected <= limit:
+                    self.assertEqual(distance, expected, (first, second, limit))
+                else:
+                    self.assertGreater(distance, limit, (first, second, limit))
+
+
+class FuzzyLookupTest(unittest.TestCase):
+    def intent(self, text, matcher=None):
+        matcher = matcher or chatbot_engine.default_matcher
+        index = matcher.resolve(normalize_text(text))
+        return None if index == NO_MATCH else matcher.intents[index]
+
+    def test_typos_find_their_rule(self):
+        cases = {
+            "thnaks": "thanks",
+            "thankyou": "thanks",
+            "wether": "weather",
+            "crikcet": "cricket",
+            "pakistn": "pakistan",
+            "good mornign": "greeting",
+            "hlelo": "greeting",
+            "whats yuor name": "name",
+        }
+        for text, intent in cases.items():
+            self.assertEqual(self.intent(text), intent, text)
+
+    def test_short_words_need_more_than_one_edit_of_evidence(self):
+        for text in ("what is your game", "hell", "what the hell"):
+            self.assertIsNone(self.intent(text), text)
+
+    def test_unrelated_messages_do_not_match(self):
+        for text in ("my vacation", "why are you", "where are you",
+                     "could you recommend a good place to eat dinner near the station tonight"):
+            self.assertIsNone(self.intent(text), text)
+
+    def test_typos_found_among_many_rules(self):
+        rng = random.Random(SEED)
+        vocabulary = sorted({"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 9)))
+                             for _ in range(3000)})
+        rules = [{"intent": f"intent{index}", "exact": [], "contains": [" ".join(rng.sample(vocabulary, 2))],
+                  "response": str(index)} for index in range(2000)]
+        matcher = IntentMatcher(rules)
+        for index in rng.sample(range(len(rules)), 200):
+            phrase = rules[index]["contains"][0]
+            position = rng.randrange(len(phrase) - 1)
+            typo = phrase[:position] + phrase[position + 1] + phrase[position] + phrase[position + 2:]
+            if typo == phrase or " " in phrase[position:position + 2]:
+                continue
+            found = matcher.resolve(typo)
+            self.assertNotEqual(found, NO_MATCH, typo)
+            # Another rule may win only with a phrase just as close
+            self.assertEqual(reference_distance(typo, matcher.rules[found]["contains"][0]), 1, typo)
+
+
+class ReloadStatsTest(unittest.TestCase):
+    def setUp(self):
+        matcher = chatbot_engine.default_matcher
+        reloader = chatbot_engine._reloader
+        self.addCleanup(setattr, chatbot_engine, "default_matcher", matcher)
+        self.addCleanup(setattr, chatbot_engine, "_reloader", reloader)
+        chatbot_engine._reloader = None
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "rules.json")
+
+    def write_rules(self, count):
+        rules = [{"intent": f"intent{index}", "exact": [f"phrase {index}"], "response": str(index)}
+                 for index in range(count)]
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump({"rules": rules}, file)
+
+    def test_stats_follow_set_rules(self):
+        self.assertEqual(chatbot_engine.reload_stats()["rules"], len(chatbot_engine.RULES))
+        chatbot_engine.set_rules([{"intent": "only", "exact": ["x"], "contains": [], "response": "y"}])
+        stats = chatbot_engine.reload_stats()
+        self.assertEqual((stats["rules"], stats["path"], stats["error"]), (1, None, None))
+
+    def test_stats_follow_reloads_and_report_failures(self):
+        reloader = chatbot_engine._reloader = chatbot_engine.RuleReloader(self.path)
+        self.write_rules(3)
+        self.assertTrue(reloader.reload())
+        stats = chatbot_engine.reload_stats()
+        self.assertEqual((stats["rules"], stats["path"], stats["error"]), (3, self.path, None))
+
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write("{broken")
+        self.assertFalse(reloader.reload())
+        stats = chatbot_engine.reload_stats()
+        # The old rules are still the ones in use
+        self.assertEqual(stats["rules"], 3)
+        self.assertTrue(stats["error"])
+
+        # Rules set in code replace the failed file's rules, and its error
+        chatbot_engine.set_rules([])
+        stats = chatbot_engine.reload_stats()
+        self.assertEqual((stats["rules"], stats["error"]), (0, None))
+
+        self.write_rules(5)
+        self.assertTrue(reloader.reload())
+        self.assertEqual(chatbot_engine.reload_stats()["rules"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests for the asyncio chatbot server and the load generator's accounting.
+
+Run with: python -m pytest -q test_chatbot_server.py
+"""
+
+import asyncio
+import json
+import unittest
+
+from chatbot_loadgen import run_load
+from chatbot_server import MAX_BODY_BYTES, MAX_HEADER_BYTES, ChatServer
+
+
+class ChatServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await ChatServer(port=0, shutdown_grace=1.0).start()
+        self.serving = asyncio.create_task(self.server.serve_until_stopped())
+
+    async def asyncTearDown(self):
+        self.server.stop()
+        await asyncio.wait_for(self.serving, 5)
+
+    async def exchange(self, raw):
+        """
+        Send raw bytes and return (status, payload, rest of the stream)
+        """
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        try:
+            writer.write(raw)
+            await writer.drain()
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            lines = head.decode("latin-1").split("\r\n")
+            length = next(int(line.split(":", 1)[1]) for line in lines if line.lower().startswith("content-length:"))
+            payload = json.loads(await reader.readexactly(length))
+            rest = await asyncio.wait_for(reader.read(), 5)
+            return int(lines[0].split(" ")[1]), payload, rest
+        finally:
+            writer.close()
+
+    async def test_chat_request(self):
+        body = json.dumps({"session": "s1", "message": "hello"}).encode()
+        status, payload, _ = await self.exchange(
+            b"POST /chat HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body))
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["session"], "s1")
+
+    async def test_malformed_request_line_gets_400(self):
+        for line in (b"GARBAGE", b"GET /health", b"GET /health HTTP/1.1 extra", b"GET /health FTP/1.0"):
+            status, payload, rest = await self.exchange(line + b"\r\nHost: x\r\n\r\n")
+            self.assertEqual(status, 400, line)
+            self.assertEqual(payload["error"], "malformed request line")
+            self.assertEqual(rest, b"")
+
+    async def test_bad_content_length_gets_400(self):
+        for value in (b"abc", b"-1", b"1.5", b"\xb2"):
+            status, payload, _ = await self.exchange(b"POST /chat HTTP/1.1\r\nContent-Length: " + value + b"\r\n\r\n")
+            self.assertEqual(status, 400, value)
+            self.assertEqual(payload["error"], "invalid Content-Length")
+
+    async def test_large_body_gets_413(self):
+        status, _, _ = await self.exchange(b"POST /chat HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (MAX_BODY_BYTES + 1))
+        self.assertEqual(status, 413)
+
+    async def test_oversized_headers_get_431(self):
+        header = b"X-Filler: " + b"a" * (MAX_HEADER_BYTES + 1) + b"\r\n"
+        status, payload, _ = await self.exchange(b"GET /health HTTP/1.1\r\n" + header + b"\r\n")
+        self.assertEqual(status, 431)
+        self.assertEqual(payload["error"], "request headers too large")
+
+
+class LoadGeneratorTest(unittest.IsolatedAsyncioTestCase):
+    async def test_successful_messages_are_timed(self):
+        server = await ChatServer(port=0).start()
+        serving = asyncio.create_task(server.serve_until_stopped())
+        try:
+            results = await run_load("127.0.0.1", server.port, sessions=3, messages=4)
+        finally:
+            server.stop()
+            await asyncio.wait_for(serving, 5)
+        self.assertEqual((results["messages"], results["errors"]), (12, 0))
+
+    async def test_error_responses_are_not_timed(self):
+        # Every connection is refused with a 503
+        server = await ChatServer(port=0, max_connections=0).start()
+        serving = asyncio.create_task(server.serve_until_stopped())
+        try:
+            results = await run_load("127.0.0.1", server.port, sessions=3, messages=4)
+        finally:
+            server.stop()
+            await asyncio.wait_for(serving, 5)
+        self.assertEqual((results["messages"], results["errors"]), (0, 3))
+        self.assertEqual((results["p50_ms"], results["p99_ms"]), (0.0, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+Differential tests: the '@' prefilter and the chunked reader must find exactly
+what the plain regex finds.
+
+Run with: python -m pytest -q test_email_extract.py
+"""
+
+import os
+import random
+import re
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+import Email_adress_extract
+from Email_adress_extract import (
+    BYTES_EMAIL_PATTERN, EMAIL_PATTERN, BloomFilter, DedupIndex, _scan_range, _split_tasks,
+    extract_emails, extract_emails_from_path, extract_incremental, extract_unique_emails, find_emails
+)
+
+SEED = 20240501
+
+# Bytes that make matches, near-matches and separators likely
+ALPHABET = b"abcXYZ019._%+-@@@...  \n\t,;<>()\"'" + bytes([0, 0x80, 0xC3, 0xA9, 0xFF])
+PIECES = [b"user", b"@", b"example", b".com", b".c", b"..", b"-", b"a.b", b"x@y", b"@@", b" ", b"\xc3\xa9"]
+
+
+def random_buffer(rng):
+    """
+    Return bytes built from single characters and email-like pieces
+    """
+    parts = []
+    for _ in range(rng.randrange(0, 60)):
+        if rng.random() < 0.5:
+            parts.append(bytes([rng.choice(ALPHABET)]))
+        else:
+            parts.append(rng.choice(PIECES))
+    return b"".join(parts)
+
+
+class FindEmailsTest(unittest.TestCase):
+    def test_matches_regex_on_random_buffers(self):
+        rng = random.Random(SEED)
+        for _ in range(20000):
+            buffer = random_buffer(rng)
+            start = rng.randrange(0, len(buffer) + 1)
+            end = rng.randrange(start, len(buffer) + 1)
+            expected = [match.group() for match in BYTES_EMAIL_PATTERN.finditer(buffer, start, end)]
+            self.assertEqual(list(find_emails(buffer, start, end)), expected, (buffer, start, end))
+
+    def test_matches_regex_on_whole_buffers(self):
+        rng = random.Random(SEED + 1)
+        for _ in range(5000):
+            buffer = random_buffer(rng)
+            self.assertEqual(list(find_emails(buffer)), BYTES_EMAIL_PATTERN.findall(buffer), buffer)
+
+    def test_adjacent_addresses(self):
+        buffer = b"a@b.cc@d.ee x.y@z.org..q@r.st"
+        self.assertEqual(list(find_emails(buffer)), BYTES_EMAIL_PATTERN.findall(buffer))
+
+
+class ExtractFromPathTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, data):
+        path = os.path.join(self.directory.name, "input.txt")
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def test_matches_findall_at_every_chunk_size(self):
+        rng = random.Random(SEED + 2)
+        for _ in range(200):
+            data = b"".join(random_buffer(rng) for _ in range(rng.randrange(1, 20)))
+            path = self.write(data)
+            expected = re.findall(EMAIL_PATTERN, data.decode("utf-8", errors="replace"))
+            for chunk_size in (1, 2, 3, 7, 64, 4096):
+                self.assertEqual(list(extract_emails_from_path(path, chunk_size)), expected, (data, chunk_size))
+
+    def test_addresses_across_chunk_boundaries(self):
+        data = b" ".join(b"name%d.last@host%d.example.com" % (index, index) for index in range(500))
+        path = self.write(data)
+        expected = re.findall(EMAIL_PATTERN, data.decode("ascii"))
+        for chunk_size in (1, 5, 13, 100, 1000):
+            self.assertEqual(list(extract_emails_from_path(path, chunk_size)), expected)
+
+
+class RangeSplitTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def single_pass(self, path):
+        with open(path, "rb") as file:
+            return list(extract_emails(file))
+
+    def range_counts(self, path, range_size):
+        """
+        Merge the per-range counts of _scan_range over every range of path
+        """
+        counts = Counter()
+        for task in _split_tasks([path], range_size):
+            counts.update(_scan_range(task)[1])
+        return counts
+
+    def test_ranges_find_what_one_pass_finds(self):
+        rng = random.Random(SEED + 3)
+        for _ in range(100):
+            data = b"".join(random_buffer(rng) for _ in range(rng.randrange(1, 20)))
+            path = self.write("input.txt", data)
+            expected = Counter(self.single_pass(path))
+            for range_size in (1, 2, 3, 7, 64, len(data) + 1):
+                self.assertEqual(self.range_counts(path, range_size), expected, (data, range_size))
+
+    def test_addresses_across_range_boundaries(self):
+        data = b" ".join(b"name%d.last@host%d.example.com" % (index, index) for index in range(300))
+        path = self.write("input.txt", data)
+        expected = Counter(self.single_pass(path))
+        self.assertEqual(sum(expected.values()), 300)
+        # Every boundary lands inside an address for some of these sizes
+        for range_size in (5, 13, 29, 100, 1000):
+            self.assertEqual(self.range_counts(path, range_size), expected, range_size)
+
+    def test_unique_output_matches_single_pass(self):
+        rng = random.Random(SEED + 4)
+        words = [b"user%d@host%d.example.com" % (rng.randrange(200), rng.randrange(3)) for _ in range(2000)]
+        path = self.write("input.txt", b" ".join(words) + b"\n")
+        output_path = os.path.join(self.directory.name, "emails.out")
+        expected = list(dict.fromkeys(self.single_pass(path)))
+        for range_size in (97, 1000, 1 << 20):
+            summary = extract_unique_emails(path, output_path, workers=2, bloom_bits=256, range_size=range_size)
+            with open(output_path, "rb") as file:
+                self.assertEqual(file.read().splitlines(), expected, range_size)
+            self.assertEqual(summary[path], {"found": len(words), "new": len(expected)})
+
+
+class DedupIndexTest(unittest.TestCase):
+    def addresses(self, count):
+        return [b"person%d@example.com" % index for index in range(count)]
+
+    def test_bloom_false_positives_do_not_drop_addresses(self):
+        # 64 bits for 2000 addresses: the filter soon claims everything is present
+        index = DedupIndex(bloom_bits=64)
+        addresses = self.addresses(2000)
+        self.assertTrue(all(index.add(address) for address in addresses))
+        self.assertFalse(any(index.add(address) for address in addresses))
+        self.assertEqual(len(index.seen), len(addresses))
+
+    def test_small_filter_really_has_false_positives(self):
+        bloom = BloomFilter(64)
+        digests = [Email_adress_extract.hashlib.blake2b(address, digest_size=16).digest()
+                   for address in self.addresses(200)]
+        for digest in digests[:100]:
+            bloom.add(digest)
+        self.assertTrue(all(digest in bloom for digest in digests[:100]))
+        self.assertGreater(sum(digest in bloom for digest in digests[100:]), 0)
+
+    def test_matches_a_plain_set(self):
+        rng = random.Random(SEED + 5)
+        for bloom_bits in (None, 8, 1024, 1 << 20):
+            index = DedupIndex(bloom_bits)
+            seen = set()
+            for _ in range(5000):
+                address = b"a%d@b.example.com" % rng.randrange(1500)
+                self.assertEqual(index.add(address), address not in seen, (bloom_bits, address))
+                seen.add(address)
+
+
+class Interrupted(Exception):
+    pass
+
+
+class IncrementalExtractTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.input_path = os.path.join(self.directory.name, "input.txt")
+        self.output_path = os.path.join(self.directory.name, "emails.out")
+
+    def write(self, data, mode="wb"):
+        with open(self.input_path, mode) as file:
+            file.write(data)
+
+    def output_lines(self):
+        with open(self.output_path, "rb") as file:
+            return file.read().splitlines()
+
+    def expected_lines(self, data):
+        """
+        Unique addresses of data in order of first appearance
+        """
+        return list(dict.fromkeys(BYTES_EMAIL_PATTERN.findall(data)))
+
+    def sample_data(self, seed, count=3000):
+        rng = random.Random(seed)
+        # Repeats are common, so duplicates across checkpoints are exercised
+        words = [b"user%d@host%d.example.com" % (rng.randrange(800), rng.randrange(3)) for _ in range(count)]
+        return b" ".join(words) + b"\n"
+
+    def run_interrupted(self, commits_before_failure, fail_before_commit):
+        """
+        Run until the given number of checkpoints is written, then raise
+        """
+        commit = Email_adress_extract._commit
+        calls = []
+
+        def failing_commit(*args):
+            calls.append(1)
+            if len(calls) > commits_before_failure:
+                if not fail_before_commit:
+                    commit(*args)
+                raise Interrupted()
+            commit(*args)
+
+        with mock.patch.object(Email_adress_extract, "_commit", failing_commit):
+            with self.assertRaises(Interrupted):
+                extract_incremental(self.input_path, self.output_path, checkpoint_bytes=4096)
+
+    def test_resume_after_interruption(self):
+        data = self.sample_data(SEED)
+        self.write(data)
+        for commits_before_failure in (0, 1, 5):
+            for fail_before_commit in (False, True):
+                for name in os.listdir(self.directory.name):
+                    if name != "input.txt":
+                        os.remove(os.path.join(self.directory.name, name))
+                self.run_interrupted(commits_before_failure, fail_before_commit)
+                extract_incremental(self.input_path, self.output_path, checkpoint_bytes=4096)
+                self.assertEqual(self.output_lines(), self.expected_lines(data),
+                                 (commits_before_failure, fail_before_commit))
+
+    def test_appended_bytes_are_the_only_ones_scanned(self):
+        first = self.sample_data(SEED + 1)
+        self.write(first)
+        summary = extract_incremental(self.input_path, self.output_path)
+        self.assertEqual(summary[self.input_path]["scanned"], len(first))
+
+        # Old addresses come back alongside new ones
+        appended = b"fresh1@new.example.org " + first[:200].rsplit(b" ", 1)[0] + b" fresh2@new.example.org\n"
+        self.write(appended, "ab")
+        summary = extract_incremental(self.input_path, self.output_path)
+        self.assertEqual(summary[self.input_path]["scanned"], len(appended))
+        self.assertEqual(summary[self.input_path]["found"], len(BYTES_EMAIL_PATTERN.findall(appended)))
+        self.assertEqual(self.output_lines(), self.expected_lines(first + appended))
+
+        summary = extract_incremental(self.input_path, self.output_path)
+        self.assertEqual(summary[self.input_path]["scanned"], 0)
+        self.assertEqual(self.output_lines(), self.expected_lines(first + appended))
+
+    def test_unfinished_last_line_waits_for_the_next_run(self):
+        self.write(b"done@example.com partial@exam")
+        extract_incremental(self.input_path, self.output_path)
+        self.assertEqual(self.output_lines(), [b"done@example.com"])
+        self.write(b"ple.com\n", "ab")
+        summary = extract_incremental(self.input_path, self.output_path)
+        self.assertEqual(self.output_lines(), [b"done@example.com", b"partial@example.com"])
+        self.assertEqual(summary[self.input_path]["new"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
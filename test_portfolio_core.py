@@ -0,0 +1,100 @@
+"""
+calculate_portfolio_value must return what the original per-position loop did.
+
+Run with: python -m pytest -q test_portfolio_core.py
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import portfolio_core
+from price_feed import make_price_provider
+
+SEED = 20240501
+
+
+def baseline_portfolio_value(portfolio, prices, warnings):
+    """
+    The loop calculate_portfolio_value used before the NumPy engine
+    """
+    total_value = 0.0
+    portfolio_details = []
+    for stock_symbol, quantity in portfolio.items():
+        if stock_symbol in prices:
+            stock_price = prices[stock_symbol]
+            stock_value = stock_price * quantity
+            total_value += stock_value
+            portfolio_details.append({
+                "stock": stock_symbol,
+                "quantity": quantity,
+                "price": stock_price,
+                "total_value": stock_value
+            })
+        else:
+            warnings.append(f"Stock {stock_symbol} not found in our database!")
+    return total_value, portfolio_details
+
+
+class CalculatePortfolioValueTest(unittest.TestCase):
+    def value_with(self, prices, portfolio):
+        warnings = []
+        provider = make_price_provider(None, prices, ttl=3600)
+        with mock.patch.object(portfolio_core, "price_provider", provider), \
+                mock.patch.object(portfolio_core, "show_warning", warnings.append):
+            result = portfolio_core.calculate_portfolio_value(portfolio)
+        return result, warnings
+
+    def assert_matches_baseline(self, prices, portfolio):
+        (total_value, details), warnings = self.value_with(prices, portfolio)
+        expected_warnings = []
+        expected_total, expected_details = baseline_portfolio_value(portfolio, prices, expected_warnings)
+        self.assertAlmostEqual(total_value, expected_total, delta=1e-9 * max(1.0, abs(expected_total)))
+        self.assertEqual(details, expected_details)
+        self.assertEqual(warnings, expected_warnings)
+
+    def test_default_prices(self):
+        self.assert_matches_baseline(portfolio_core.STOCK_PRICES, {"AAPL": 10, "TSLA": 5, "INTC": 1})
+
+    def test_unknown_symbols_warn_and_are_left_out(self):
+        self.assert_matches_baseline(portfolio_core.STOCK_PRICES, {"AAPL": 2, "NOPE": 3, "MSFT": 1, "ZZZ": 7})
+
+    def test_only_unknown_symbols(self):
+        self.assert_matches_baseline(portfolio_core.STOCK_PRICES, {"NOPE": 3})
+
+    def test_empty_portfolio(self):
+        (total_value, details), warnings = self.value_with(portfolio_core.STOCK_PRICES, {})
+        self.assertEqual((total_value, details, warnings), (0.0, [], []))
+
+    def test_random_portfolios(self):
+        rng = random.Random(SEED)
+        prices = {f"SYM{index:04d}": round(rng.uniform(1, 3000), 2) for index in range(500)}
+        for _ in range(50):
+            symbols = rng.sample(sorted(prices) + [f"GONE{index}" for index in range(20)], rng.randrange(0, 200))
+            portfolio = {symbol: rng.randint(1, 1000) for symbol in symbols}
+            self.assert_matches_baseline(prices, portfolio)
+
+
+class PriceHistoryDirectoryTest(unittest.TestCase):
+    def test_point_in_time_valuation_creates_no_directory(self):
+        with tempfile.TemporaryDirectory() as parent:
+            directory = os.path.join(parent, "price_history")
+            warnings = []
+            with mock.patch.object(portfolio_core, "PRICE_HISTORY_DIR", directory), \
+                    mock.patch.object(portfolio_core, "_price_history", None), \
+                    mock.patch.object(portfolio_core, "show_warning", warnings.append):
+                total_value, details = portfolio_core.calculate_portfolio_value({"AAPL": 1}, as_of=0)
+                self.assertEqual(portfolio_core.get_price_history().symbols(), [])
+                self.assertFalse(os.path.exists(directory))
+
+                portfolio_core.get_price_history().append("AAPL", [0], [10.0])
+                self.assertTrue(os.path.isdir(directory))
+                self.assertEqual(portfolio_core.calculate_portfolio_value({"AAPL": 2}, as_of=0)[0], 20.0)
+        self.assertEqual((total_value, details), (0.0, []))
+        self.assertEqual(warnings, ["Stock AAPL not found in our database!"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Randomized tests for the incrementally updated Portfolio.
+
+Run with: python -m pytest -q test_portfolio_engine.py
+"""
+
+import random
+import unittest
+
+from portfolio_engine import Portfolio
+
+SEED = 20240501
+
+
+class PortfolioTest(unittest.TestCase):
+    def test_random_operations_keep_the_total_consistent(self):
+        rng = random.Random(SEED)
+        for _ in range(50):
+            prices = {f"SYM{index}": round(rng.uniform(0.01, 5000), 2) for index in range(20)}
+            portfolio = Portfolio(prices)
+            # Plain model of what the portfolio should hold
+            held = {}
+            current_prices = dict(prices)
+            for _ in range(500):
+                symbol = rng.choice(sorted(prices))
+                action = rng.random()
+                if action < 0.35:
+                    quantity = rng.randint(1, 10000)
+                    portfolio.add(symbol, quantity)
+                    held[symbol] = held.get(symbol, 0) + quantity
+                elif action < 0.55:
+                    quantity = rng.randint(-5, 10000)
+                    portfolio.set_quantity(symbol, quantity)
+                    if quantity > 0:
+                        held[symbol] = quantity
+                    else:
+                        held.pop(symbol, None)
+                elif action < 0.7:
+                    portfolio.remove(symbol)
+                    held.pop(symbol, None)
+                else:
+                    price = round(rng.uniform(0.01, 5000), 2)
+                    portfolio.update_price(symbol, price)
+                    if symbol in held:
+                        current_prices[symbol] = price
+                if symbol not in held:
+                    # A symbol added again starts from the source price
+                    current_prices[symbol] = prices[symbol]
+
+                self.assertTrue(portfolio.check_consistency())
+                self.assertEqual(portfolio.quantities, held)
+                expected = sum(current_prices[name] * quantity for name, quantity in held.items())
+                self.assertAlmostEqual(portfolio.recompute_total(), expected,
+                                       delta=1e-9 * max(1.0, abs(expected)))
+
+            details = portfolio.details()
+            self.assertEqual([row["stock"] for row in details], list(held))
+            for row in details:
+                self.assertEqual(row["price"], current_prices[row["stock"]])
+                self.assertEqual(row["quantity"], held[row["stock"]])
+
+    def test_emptied_portfolio_resets_to_zero(self):
+        portfolio = Portfolio({"AAPL": 0.1, "TSLA": 0.2})
+        for _ in range(1000):
+            portfolio.add("AAPL", 3)
+            portfolio.add("TSLA", 7)
+            portfolio.update_price("AAPL", 0.3)
+        portfolio.remove("AAPL")
+        portfolio.set_quantity("TSLA", 0)
+        self.assertFalse(portfolio)
+        self.assertEqual(portfolio.total_value, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
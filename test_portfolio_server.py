@@ -0,0 +1,162 @@
+"""
+Tests for the striped account store and its JSON API.
+
+Run with: python -m pytest -q test_portfolio_server.py
+"""
+
+import http.client
+import json
+import random
+import threading
+import unittest
+
+from portfolio_server import AccountStore, PortfolioServer
+from price_feed import StaticPriceProvider
+
+SEED = 20240501
+
+PRICES = {"AAPL": 180.5, "TSLA": 250.75, "MSFT": 415.3, "INTC": 28.45}
+
+
+class AccountStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.provider = StaticPriceProvider(dict(PRICES))
+        self.store = AccountStore(self.provider, stripes=4)
+
+    def test_value_matches_positions(self):
+        self.store.add("alice", "AAPL", 10)
+        self.store.add("alice", "TSLA", 2)
+        self.store.add("alice", "AAPL", 5)
+        total_value, details, missing = self.store.value("alice")
+        self.assertEqual(self.store.positions("alice"), {"AAPL": 15, "TSLA": 2})
+        self.assertAlmostEqual(total_value, 15 * 180.5 + 2 * 250.75)
+        self.assertEqual([row["stock"] for row in details], ["AAPL", "TSLA"])
+        self.assertEqual(missing, [])
+
+    def test_symbols_without_a_price_are_reported(self):
+        self.store.add("alice", "AAPL", 1)
+        self.store.add("alice", "INTC", 3)
+        del self.provider.prices["INTC"]
+        total_value, details, missing = self.store.value("alice")
+        self.assertAlmostEqual(total_value, 180.5)
+        self.assertEqual([row["stock"] for row in details], ["AAPL"])
+        self.assertEqual(missing, ["INTC"])
+
+    def test_removals_never_create_accounts(self):
+        self.assertEqual(self.store.add("ghost", "AAPL", -5), 0)
+        self.assertFalse(self.store.remove("ghost", "AAPL"))
+        self.assertIsNone(self.store.value("ghost"))
+        self.assertEqual(self.store.account_count(), 0)
+
+    def test_freed_rows_and_accounts_are_reused(self):
+        for _ in range(100):
+            self.store.set_quantity("alice", "AAPL", 3)
+            self.store.set_quantity("bob", "TSLA", 4)
+            self.assertTrue(self.store.delete_account("alice"))
+            self.store.remove("bob", "TSLA")
+        stripe_rows = sum(len(stripe.symbols) for stripe in self.store.stripes)
+        self.assertLessEqual(stripe_rows, 2)
+        self.assertEqual(self.store.totals(), {"bob": 0.0})
+
+    def test_totals_match_each_account(self):
+        rng = random.Random(SEED)
+        for _ in range(2000):
+            account = f"acct{rng.randrange(50)}"
+            symbol = rng.choice(sorted(PRICES))
+            action = rng.random()
+            if action < 0.6:
+                self.store.add(account, symbol, rng.randint(-5, 20))
+            elif action < 0.9:
+                self.store.set_quantity(account, symbol, rng.randint(0, 20))
+            else:
+                self.store.delete_account(account)
+        totals = self.store.totals()
+        self.assertEqual(len(totals), self.store.account_count())
+        for account, total_value in totals.items():
+            expected = sum(PRICES[symbol] * quantity
+                           for symbol, quantity in self.store.positions(account).items())
+            self.assertAlmostEqual(total_value, expected, places=6)
+            self.assertAlmostEqual(self.store.value(account)[0], expected, places=6)
+
+    def test_concurrent_updates_are_not_lost(self):
+        # Two stripes for twenty accounts, so threads contend on the same
+        # locks and often on the same account
+        store = AccountStore(self.provider, stripes=2)
+        accounts = [f"acct{index}" for index in range(20)]
+        symbols = sorted(PRICES)
+        expected = {}
+        plans = []
+        rng = random.Random(SEED)
+        for _ in range(8):
+            plan = [(rng.choice(accounts), rng.choice(symbols), rng.randint(1, 5)) for _ in range(2000)]
+            for account, symbol, quantity in plan:
+                key = (account, symbol)
+                expected[key] = expected.get(key, 0) + quantity
+            plans.append(plan)
+        start = threading.Barrier(len(plans))
+
+        def run(plan):
+            start.wait()
+            for account, symbol, quantity in plan:
+                store.add(account, symbol, quantity)
+                store.value(account)
+
+        threads = [threading.Thread(target=run, args=(plan,)) for plan in plans]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        actual = {(account, symbol): quantity for account in accounts
+                  for symbol, quantity in (store.positions(account) or {}).items()}
+        self.assertEqual(actual, expected)
+
+
+class PortfolioServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = PortfolioServer(("127.0.0.1", 0), AccountStore(StaticPriceProvider(dict(PRICES)), stripes=4))
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def request(self, method, path, payload=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+        try:
+            body = None if payload is None else json.dumps(payload)
+            connection.request(method, path, body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_fractional_quantities_are_rejected(self):
+        for quantity in (2.5, "2.5", True, None):
+            status, _ = self.request("POST", "/accounts/alice/positions", {"symbol": "AAPL", "quantity": quantity})
+            self.assertEqual(status, 400, quantity)
+            status, _ = self.request("PUT", "/accounts/alice/positions/AAPL", {"quantity": quantity})
+            self.assertEqual(status, 400, quantity)
+        self.assertEqual(self.request("GET", "/accounts/alice")[0], 404)
+
+    def test_whole_quantities_are_accepted(self):
+        status, body = self.request("POST", "/accounts/alice/positions", {"symbol": "aapl", "quantity": 3.0})
+        self.assertEqual((status, body["quantity"]), (200, 3))
+        status, body = self.request("PUT", "/accounts/alice/positions/TSLA", {"quantity": "2"})
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(body["total_value"], 3 * 180.5 + 2 * 250.75)
+        self.assertNotIn("warnings", body)
+        status, body = self.request("GET", "/accounts")
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(body["accounts"]["alice"], 3 * 180.5 + 2 * 250.75)
+
+    def test_unknown_symbols_come_back_as_warnings(self):
+        self.request("POST", "/accounts/alice/positions", {"symbol": "INTC", "quantity": 1})
+        del self.server.store.prices.prices["INTC"]
+        status, body = self.request("GET", "/accounts/alice")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["positions"], [])
+        self.assertEqual(body["warnings"], ["Stock INTC not found in our database!"])
+
+
+if __name__ == "__main__":
+    unittest.main()
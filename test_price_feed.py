@@ -0,0 +1,159 @@
+"""
+Tests for the TTL/LRU price cache.
+
+Run with: python -m pytest -q test_price_feed.py
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+from price_feed import CachedPriceProvider, PriceProvider, StaticPriceProvider
+
+
+class RecordingProvider(PriceProvider):
+    """
+    Upstream that records every bulk request it receives
+    """
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.requests = []
+
+    def get_quotes(self, symbols):
+        self.requests.append(list(symbols))
+        return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+
+    def symbols(self):
+        return list(self.prices)
+
+
+class BlockingProvider(RecordingProvider):
+    """
+    Upstream whose requests wait until release is set
+    """
+
+    def __init__(self, prices, error=None):
+        super().__init__(prices)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = error
+
+    def get_quotes(self, symbols):
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return super().get_quotes(symbols)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CachedPriceProviderTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("price_feed.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_quotes_are_reused_until_the_ttl_expires(self):
+        upstream = RecordingProvider({"AAPL": 1.0})
+        cache = CachedPriceProvider(upstream, ttl=60)
+        self.assertEqual(cache.get_quotes(["AAPL"]), {"AAPL": 1.0})
+        upstream.prices["AAPL"] = 2.0
+        self.clock.now += 59
+        self.assertEqual(cache.get_quotes(["AAPL"]), {"AAPL": 1.0})
+        self.clock.now += 2
+        self.assertEqual(cache.get_quotes(["AAPL"]), {"AAPL": 2.0})
+        self.assertEqual(upstream.requests, [["AAPL"], ["AAPL"]])
+
+    def test_unknown_symbols_are_cached_as_missing(self):
+        upstream = RecordingProvider({"AAPL": 1.0})
+        cache = CachedPriceProvider(upstream, ttl=60)
+        self.assertEqual(cache.get_quotes(["AAPL", "NOPE"]), {"AAPL": 1.0})
+        self.assertEqual(cache.get_quotes(["NOPE"]), {})
+        self.assertNotIn("NOPE", cache)
+        self.assertEqual(len(upstream.requests), 1)
+        self.clock.now += 61
+        cache.get_quotes(["NOPE"])
+        self.assertEqual(upstream.requests[-1], ["NOPE"])
+
+    def test_repeated_symbols_are_fetched_once(self):
+        upstream = RecordingProvider({"AAPL": 1.0, "TSLA": 2.0})
+        cache = CachedPriceProvider(upstream)
+        self.assertEqual(cache.get_quotes(["AAPL", "TSLA", "AAPL"]), {"AAPL": 1.0, "TSLA": 2.0})
+        self.assertEqual(upstream.requests, [["AAPL", "TSLA"]])
+
+    def test_least_recently_used_symbols_are_evicted(self):
+        upstream = RecordingProvider({"A": 1.0, "B": 2.0, "C": 3.0})
+        cache = CachedPriceProvider(upstream, max_size=2)
+        cache.get_quotes(["A", "B"])
+        cache.get_quotes(["A"])
+        cache.get_quotes(["C"])
+        self.assertEqual(list(cache.cache), ["A", "C"])
+        cache.get_quotes(["B"])
+        self.assertEqual(upstream.requests[-1], ["B"])
+
+    def test_unbounded_by_default(self):
+        prices = {f"SYM{index}": float(index) for index in range(20000)}
+        upstream = RecordingProvider(prices)
+        cache = CachedPriceProvider(upstream)
+        cache.get_quotes(list(prices))
+        self.assertEqual(cache.get_quotes(list(prices)), prices)
+        self.assertEqual(len(upstream.requests), 1)
+
+    def test_concurrent_requests_for_a_symbol_are_coalesced(self):
+        upstream = BlockingProvider({"AAPL": 1.0})
+        cache = CachedPriceProvider(upstream)
+        results = []
+        first = threading.Thread(target=lambda: results.append(cache.get_quotes(["AAPL"])))
+        first.start()
+        self.assertTrue(upstream.started.wait(5))
+        second = threading.Thread(target=lambda: results.append(cache.get_quotes(["AAPL"])))
+        second.start()
+        upstream.release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(results, [{"AAPL": 1.0}, {"AAPL": 1.0}])
+        self.assertEqual(upstream.requests, [["AAPL"]])
+        self.assertEqual(cache.upstream_calls, 1)
+
+    def test_upstream_errors_reach_every_waiter(self):
+        upstream = BlockingProvider({"AAPL": 1.0}, error=OSError("feed down"))
+        cache = CachedPriceProvider(upstream)
+        errors = []
+
+        def fetch():
+            try:
+                cache.get_quotes(["AAPL"])
+            except OSError as e:
+                errors.append(str(e))
+
+        first = threading.Thread(target=fetch)
+        first.start()
+        self.assertTrue(upstream.started.wait(5))
+        second = threading.Thread(target=fetch)
+        second.start()
+        upstream.release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(errors, ["feed down", "feed down"])
+        # Nothing was cached, so the next call asks upstream again
+        upstream.error = None
+        self.assertEqual(cache.get_quotes(["AAPL"]), {"AAPL": 1.0})
+
+    def test_static_provider_through_cache(self):
+        cache = CachedPriceProvider(StaticPriceProvider({"AAPL": 1.5}))
+        self.assertEqual(cache["AAPL"], 1.5)
+        with self.assertRaises(KeyError):
+            cache["NOPE"]
+
+
+if __name__ == "__main__":
+    unittest.main()